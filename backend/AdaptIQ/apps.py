@@ -2,4 +2,10 @@ from django.apps import AppConfig
 
 class AdaptiqConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'AdaptIQ'
\ No newline at end of file
+    name = 'AdaptIQ'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (registers cache invalidation)
+        from . import tasks  # noqa: F401  (registers background task handlers)
+        # The warm start runs from the WSGI/ASGI entry points (see warmup.py),
+        # not here: ready() also runs for every management command.
@@ -0,0 +1,252 @@
+"""Background jobs for writes that do not need to finish inside the request.
+
+Tasks are batch handlers registered by name with ``@task``; ``enqueue`` hands
+them a JSON-serializable payload once the surrounding transaction commits.
+Two queues are available (``ADAPTIQ_TASK_BACKEND``):
+
+* ``memory`` - flushed by a daemon thread in the web process. Cheap, but
+  anything still queued is lost if the process dies.
+* ``sqlite`` - a durable local SQLite file drained by ``manage.py
+  run_task_worker``. Jobs are claimed with a visibility timeout and deleted
+  only after their handler succeeds, so delivery is at-least-once.
+* ``null`` - discards every job (benchmarks and timing reports).
+"""
+import atexit
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+
+
+def task(name):
+    """Register a batch handler, called with a list of payload dicts"""
+    def decorator(func):
+        _handlers[name] = func
+        return func
+    return decorator
+
+
+def run_batch(name, payloads):
+    """Run one handler over a batch of payloads"""
+    close_old_connections()
+    try:
+        _handlers[name](payloads)
+    finally:
+        close_old_connections()
+
+
+def group_by_name(jobs):
+    """Group (name, payload, ...) tuples into name -> [job, ...]"""
+    groups = defaultdict(list)
+    for job in jobs:
+        groups[job[0]].append(job)
+    return groups
+
+
+class MemoryQueue:
+    """In-process queue flushed in batches by a daemon thread"""
+
+    def __init__(self, batch_size=100, flush_interval=1.0, max_attempts=5):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def put(self, name, payload):
+        self._queue.put((name, payload, 0))
+        if self._thread is None or not self._thread.is_alive():
+            self._start()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if self._thread is None:
+                atexit.register(self.flush)
+            self._thread = threading.Thread(target=self._run, name='adaptiq-background', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self.process(self._collect())
+
+    def _collect(self):
+        """Wait for up to ``flush_interval`` seconds or ``batch_size`` jobs"""
+        jobs = [self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(jobs) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                jobs.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return jobs
+
+    def process(self, jobs):
+        for name, group in group_by_name(jobs).items():
+            try:
+                run_batch(name, [payload for _, payload, _ in group])
+            except Exception:
+                logger.exception('Background task %s failed for %d jobs', name, len(group))
+                for _, payload, attempts in group:
+                    if attempts + 1 < self.max_attempts:
+                        self._queue.put((name, payload, attempts + 1))
+                    else:
+                        logger.error('Giving up on %s job after %d attempts: %s', name, attempts + 1, payload)
+
+    def flush(self):
+        """Run everything queued right now (called at interpreter exit)"""
+        jobs = []
+        while True:
+            try:
+                jobs.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if jobs:
+            self.process(jobs)
+
+
+class NullQueue:
+    """Drops every job"""
+
+    def put(self, name, payload):
+        pass
+
+
+class SQLiteQueue:
+    """Durable queue in a local SQLite file, drained by run_task_worker"""
+
+    def __init__(self, path, batch_size=100, visibility_timeout=60, max_attempts=5):
+        self.path = str(path)
+        self.batch_size = batch_size
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+
+    def _connect(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS jobs ('
+                ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+                ' name TEXT NOT NULL,'
+                ' payload TEXT NOT NULL,'
+                ' attempts INTEGER NOT NULL DEFAULT 0,'
+                ' available_at REAL NOT NULL)'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS jobs_available ON jobs (available_at)')
+            self._local.connection = connection
+        return connection
+
+    def put(self, name, payload):
+        self._connect().execute(
+            'INSERT INTO jobs (name, payload, available_at) VALUES (?, ?, ?)',
+            (name, json.dumps(payload), time.time())
+        )
+
+    def claim(self):
+        """Lease up to ``batch_size`` due jobs; they reappear if not acked in time"""
+        connection = self._connect()
+        now = time.time()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            rows = connection.execute(
+                'SELECT id, name, payload, attempts FROM jobs'
+                ' WHERE available_at <= ? AND attempts < ? ORDER BY id LIMIT ?',
+                (now, self.max_attempts, self.batch_size)
+            ).fetchall()
+            connection.executemany(
+                'UPDATE jobs SET attempts = attempts + 1, available_at = ? WHERE id = ?',
+                [(now + self.visibility_timeout, row[0]) for row in rows]
+            )
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        return [(name, json.loads(payload), job_id, attempts) for job_id, name, payload, attempts in rows]
+
+    def ack(self, job_ids):
+        self._connect().executemany('DELETE FROM jobs WHERE id = ?', [(job_id,) for job_id in job_ids])
+
+    def retry_later(self, jobs):
+        """Make failed jobs due again after an exponential backoff"""
+        now = time.time()
+        self._connect().executemany(
+            'UPDATE jobs SET available_at = ? WHERE id = ?',
+            [(now + min(2 ** attempts, 300), job_id) for _, _, job_id, attempts in jobs]
+        )
+
+    def process_once(self):
+        """Claim and run one batch. Returns the number of jobs claimed"""
+        jobs = self.claim()
+        for name, group in group_by_name(jobs).items():
+            try:
+                run_batch(name, [payload for _, payload, _, _ in group])
+            except Exception:
+                logger.exception('Background task %s failed for %d jobs', name, len(group))
+                self.retry_later(group)
+            else:
+                self.ack([job_id for _, _, job_id, _ in group])
+        return len(jobs)
+
+    def counts(self):
+        """Return (pending, dead) job counts"""
+        pending, dead = self._connect().execute(
+            'SELECT COALESCE(SUM(attempts < ?), 0), COALESCE(SUM(attempts >= ?), 0) FROM jobs',
+            (self.max_attempts, self.max_attempts)
+        ).fetchone()
+        return pending, dead
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_queue():
+    """Return the configured queue (one per process)"""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                batch_size = getattr(settings, 'ADAPTIQ_TASK_BATCH_SIZE', 100)
+                max_attempts = getattr(settings, 'ADAPTIQ_TASK_MAX_ATTEMPTS', 5)
+                backend = getattr(settings, 'ADAPTIQ_TASK_BACKEND', 'memory')
+                if backend == 'null':
+                    _queue = NullQueue()
+                elif backend == 'sqlite':
+                    _queue = SQLiteQueue(
+                        settings.ADAPTIQ_TASK_QUEUE_PATH,
+                        batch_size=batch_size,
+                        visibility_timeout=getattr(settings, 'ADAPTIQ_TASK_VISIBILITY_TIMEOUT', 60),
+                        max_attempts=max_attempts,
+                    )
+                else:
+                    _queue = MemoryQueue(
+                        batch_size=batch_size,
+                        flush_interval=getattr(settings, 'ADAPTIQ_TASK_FLUSH_INTERVAL', 1.0),
+                        max_attempts=max_attempts,
+                    )
+    return _queue
+
+
+def enqueue(name, payload):
+    """Queue a job to run after the current transaction commits"""
+    if name not in _handlers:
+        raise KeyError(f'Unknown background task: {name}')
+    transaction.on_commit(lambda: get_queue().put(name, payload))
@@ -0,0 +1,97 @@
+"""Face detection run inside the proctoring worker processes.
+
+Kept free of Django imports so spawned workers can import it without
+configuring settings. Requires ``numpy`` and ``opencv-python-headless<5``:
+OpenCV 5 dropped ``cv2.CascadeClassifier`` from the main module, which the
+Haar face detector needs. check_support() fails early with that message
+instead of every worker dying on its first frame.
+"""
+import time
+
+SUPPORTED_OPENCV = 'opencv-python-headless>=4.5,<5'
+
+# Per-process state, set up once by init_worker()
+_cascade = None
+
+# Frames are shrunk to this width before detection
+DETECTION_WIDTH = 320
+
+
+def load_cascade():
+    """Return the frontal face Haar cascade, or raise RuntimeError if OpenCV cannot provide it"""
+    import cv2
+
+    if not hasattr(cv2, 'CascadeClassifier') or not hasattr(cv2, 'data'):
+        raise RuntimeError(
+            f'OpenCV {cv2.__version__} has no Haar cascade support; install {SUPPORTED_OPENCV}'
+        )
+    cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    if cascade.empty():
+        raise RuntimeError('Could not load the Haar face cascade bundled with OpenCV')
+    return cascade
+
+
+def check_support():
+    """Raise ImportError or RuntimeError if face detection cannot run in this environment"""
+    load_cascade()
+
+
+def init_worker():
+    """Load the Haar cascade and pin OpenCV to a single CPU thread"""
+    global _cascade
+    import cv2
+
+    cv2.setNumThreads(1)
+    cv2.ocl.setUseOpenCL(False)  # CPU only
+    _cascade = load_cascade()
+
+
+def detect_faces(jpeg_bytes):
+    """Count the faces in a JPEG frame"""
+    import cv2
+    import numpy as np
+
+    if _cascade is None:
+        init_worker()
+
+    started = time.perf_counter()
+    image = cv2.imdecode(np.frombuffer(jpeg_bytes, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+    if image is None:
+        return {'error': 'undecodable_frame'}
+
+    height, width = image.shape
+    if width > DETECTION_WIDTH:
+        image = cv2.resize(image, (DETECTION_WIDTH, int(height * DETECTION_WIDTH / width)), interpolation=cv2.INTER_AREA)
+    image = cv2.equalizeHist(image)
+    decoded = time.perf_counter()
+
+    faces = _cascade.detectMultiScale(image, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30))
+
+    return {
+        'faces': len(faces),
+        'decode_ms': (decoded - started) * 1000,
+        'detect_ms': (time.perf_counter() - decoded) * 1000,
+    }
+
+
+# Thumbnail size used for motion gating
+MOTION_SIZE = (32, 24)
+
+
+def motion_thumbnail(jpeg_bytes):
+    """Decode a JPEG at 1/8 scale into a tiny grayscale thumbnail"""
+    import cv2
+    import numpy as np
+
+    # The reduced-size decode skips most of the JPEG work
+    image = cv2.imdecode(np.frombuffer(jpeg_bytes, dtype=np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    if image is None:
+        return None
+    return cv2.resize(image, MOTION_SIZE, interpolation=cv2.INTER_AREA)
+
+
+def frame_difference(first, second):
+    """Mean absolute pixel difference between two thumbnails (0-255)"""
+    import cv2
+
+    return float(cv2.absdiff(first, second).mean())
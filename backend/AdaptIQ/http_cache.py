@@ -0,0 +1,102 @@
+"""Conditional GET and response caching for read-only endpoints.
+
+Each data source has a version counter in the Django cache, bumped whenever
+it changes (see signals.py and tasks.py). Versions are millisecond
+timestamps, so they double as Last-Modified and stay unique across restarts
+of a per-process cache. ETags are built from the versions alone, so a 304
+never touches the database.
+
+The counters live in CACHES['default']. With more than one worker that must
+be a shared backend (Redis, Memcached, database cache): with the per-process
+LocMemCache a change is only seen by the worker that made it, and the others
+keep answering 304 with stale data.
+"""
+import functools
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+from rest_framework.response import Response
+
+QUESTION = 'question'
+QUIZ_SESSION = 'quiz_session'
+QUESTION_STATS = 'question_stats'
+
+
+def _key(name):
+    return f'adaptiq:version:{name}'
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+def get_versions(*names):
+    """Return {name: version}, initialising missing counters"""
+    found = cache.get_many([_key(name) for name in names])
+    versions = {}
+    for name in names:
+        version = found.get(_key(name))
+        if version is None:
+            cache.add(_key(name), _now_ms(), timeout=None)
+            version = cache.get(_key(name))
+        versions[name] = version
+    return versions
+
+
+def bump(name):
+    """Mark a data source as changed"""
+    current = cache.get(_key(name)) or 0
+    cache.set(_key(name), max(current + 1, _now_ms()), timeout=None)
+
+
+def conditional(*names):
+    """ETag/Last-Modified support from the named version counters"""
+    def etag(request, *args, **kwargs):
+        versions = get_versions(*names)
+        return '-'.join(f'{name}.{versions[name]}' for name in names)
+
+    def last_modified(request, *args, **kwargs):
+        newest = max(get_versions(*names).values())
+        return datetime.fromtimestamp(newest / 1000, tz=timezone.utc)
+
+    def decorator(view):
+        conditional_view = condition(etag_func=etag, last_modified_func=last_modified)(view)
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            # Let clients keep the body but revalidate before reusing it
+            patch_cache_control(response, private=True, must_revalidate=True, max_age=settings.ADAPTIQ_HTTP_CACHE_MAX_AGE)
+            return response
+        return wrapper
+    return decorator
+
+
+def cached_view(*names, ttl=None):
+    """Cache a DRF view's response data until the named versions change or ttl passes"""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            versions = get_versions(*names)
+            user = request.user.pk if request.user.is_authenticated else 'anon'
+            key = ':'.join([
+                'adaptiq:response', view.__name__, str(user), request.get_full_path(),
+                *(str(versions[name]) for name in names)
+            ])
+
+            cached = cache.get(key)
+            if cached is not None:
+                data, status_code = cached
+                return Response(data, status=status_code)
+
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                timeout = ttl if ttl is not None else settings.ADAPTIQ_RESPONSE_CACHE_TTL
+                cache.set(key, (response.data, response.status_code), timeout)
+            return response
+        return wrapper
+    return decorator
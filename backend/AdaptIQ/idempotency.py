@@ -0,0 +1,68 @@
+import threading
+import time
+
+from django.conf import settings
+
+
+class _Entry:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.failed = False
+        self.expires_at = None
+
+
+_lock = threading.Lock()
+_entries = {}  # idempotency key -> _Entry
+
+
+def _purge(now):
+    """Forget finished results whose TTL has passed"""
+    for key in [k for k, e in _entries.items() if e.expires_at is not None and e.expires_at <= now]:
+        del _entries[key]
+
+
+def coalesce(key, func, timeout=10):
+    """Run ``func`` once per idempotency key and share its result.
+
+    ``func`` returns a ``(data, status)`` pair. Concurrent duplicates wait for
+    the in-flight call; later retries get the stored result until it expires.
+    Only successful results are kept, so a failed call can be retried. If the
+    in-flight call raises, waiting duplicates run ``func`` themselves instead
+    of sharing the failure. Returns None if a duplicate gave up waiting.
+    """
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and entry.expires_at is not None and entry.expires_at <= now:
+            entry = None
+        owner = entry is None
+        if owner:
+            if len(_entries) > 10000:
+                _purge(now)
+            entry = _entries[key] = _Entry()
+
+    if not owner:
+        if not entry.done.wait(timeout):
+            return None
+        if entry.failed:
+            return coalesce(key, func, timeout)
+        return entry.result
+
+    try:
+        entry.result = func()
+    except Exception:
+        entry.failed = True
+        with _lock:
+            _entries.pop(key, None)
+        raise
+    finally:
+        entry.done.set()
+
+    data, status_code = entry.result
+    with _lock:
+        if 200 <= status_code < 300:
+            entry.expires_at = time.monotonic() + getattr(settings, 'ADAPTIQ_IDEMPOTENCY_TTL', 300)
+        else:
+            _entries.pop(key, None)
+    return entry.result
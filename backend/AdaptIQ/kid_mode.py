@@ -0,0 +1,71 @@
+import threading
+import time
+
+from django.conf import settings
+
+from .models import KidMode
+
+DIFFICULTY_LEVELS = ['easy', 'medium', 'hard']
+
+# user id -> (policy dict or None, expires_at). Negative lookups are cached too,
+# so users without kid mode cost no query per answer either.
+_lock = threading.Lock()
+_policies = {}
+
+
+def _rank(difficulty):
+    if difficulty in DIFFICULTY_LEVELS:
+        return DIFFICULTY_LEVELS.index(difficulty)
+    return DIFFICULTY_LEVELS.index('medium')
+
+
+def get_policy(user_id):
+    """Return the enabled kid-mode settings for a user, or None"""
+    if user_id is None:
+        return None
+
+    now = time.monotonic()
+    entry = _policies.get(user_id)
+    if entry is not None and entry[1] > now:
+        return entry[0]
+
+    policy = (
+        KidMode.objects.filter(user_id=user_id, is_enabled=True)
+        .values('max_difficulty', 'time_limit_per_question')
+        .first()
+    )
+    ttl = getattr(settings, 'ADAPTIQ_KID_MODE_CACHE_TTL', 60)
+    with _lock:
+        if len(_policies) > 10000:
+            _policies.clear()
+        _policies[user_id] = (policy, now + ttl)
+    return policy
+
+
+def invalidate(user_id):
+    """Forget a user's cached policy (called when their KidMode changes)"""
+    with _lock:
+        _policies.pop(user_id, None)
+
+
+def allows(policy, difficulty):
+    """Whether a difficulty is within the policy's cap"""
+    if policy is None:
+        return True
+    return _rank(difficulty) <= _rank(policy['max_difficulty'])
+
+
+def cap_difficulty(policy, difficulty):
+    """Lower a difficulty to the policy's cap if it exceeds it"""
+    if allows(policy, difficulty):
+        return difficulty
+    return DIFFICULTY_LEVELS[_rank(policy['max_difficulty'])]
+
+
+def is_timed_out(policy, served_at, now=None):
+    """Whether the per-question time limit has passed since the question was served"""
+    if policy is None or served_at is None:
+        return False
+    now = time.time() if now is None else now
+    grace = getattr(settings, 'ADAPTIQ_KID_MODE_GRACE_SECONDS', 2)
+    return now - served_at > policy['time_limit_per_question'] + grace
@@ -0,0 +1,113 @@
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from AdaptIQ import face_detection
+from AdaptIQ.proctoring import MotionGate
+
+class Command(BaseCommand):
+    help = 'Benchmark proctoring frames/second per core with and without motion gating'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--frames',
+            type=int,
+            default=300,
+            help='Number of synthetic frames to generate'
+        )
+        parser.add_argument(
+            '--frames-dir',
+            help='Directory of recorded JPEG frames to use instead of synthetic ones'
+        )
+        parser.add_argument(
+            '--fps',
+            type=float,
+            default=5.0,
+            help='Capture rate the frames are assumed to arrive at'
+        )
+        parser.add_argument(
+            '--motion-every',
+            type=int,
+            default=50,
+            help='Synthetic frames between scene changes'
+        )
+        parser.add_argument(
+            '--sample-rate',
+            type=float,
+            default=0,
+            help='Frames analysed per second (0 = every frame)'
+        )
+        parser.add_argument(
+            '--motion-threshold',
+            type=float,
+            default=6.0,
+            help='Mean pixel change (0-255) that triggers detection'
+        )
+        parser.add_argument(
+            '--max-interval',
+            type=float,
+            default=5.0,
+            help='Seconds before detection runs regardless of motion'
+        )
+
+    def handle(self, *args, **options):
+        if options['frames_dir']:
+            frames = self.load_frames(options['frames_dir'])
+        else:
+            frames = self.synthetic_frames(options['frames'], options['motion_every'])
+        if not frames:
+            raise CommandError('No frames to benchmark')
+
+        # Same single-threaded CPU setup as the worker processes, so this is per core
+        face_detection.init_worker()
+        timestamps = [i / options['fps'] for i in range(len(frames))]
+
+        self.stdout.write(f'Benchmarking {len(frames)} frames on one core...')
+
+        started = time.process_time()
+        for frame in frames:
+            face_detection.detect_faces(frame)
+        ungated = time.process_time() - started
+        self.report('without gating', len(frames), len(frames), ungated)
+
+        gate = MotionGate(options['sample_rate'], options['motion_threshold'], options['max_interval'])
+        detected = 0
+        started = time.process_time()
+        for frame, timestamp in zip(frames, timestamps):
+            reason, thumbnail = gate.check(frame, timestamp)
+            if reason is None:
+                gate.commit(thumbnail, timestamp)
+                face_detection.detect_faces(frame)
+                detected += 1
+        gated = time.process_time() - started
+        self.report('with gating', len(frames), detected, gated)
+
+        if gated:
+            self.stdout.write(self.style.SUCCESS(f'Speedup: {ungated / gated:.1f}x'))
+
+    def report(self, label, frames, detected, seconds):
+        rate = frames / seconds if seconds else float('inf')
+        self.stdout.write(
+            f'  {label}: {rate:.1f} frames/s/core, '
+            f'{detected}/{frames} frames ran detection, {seconds * 1000 / frames:.2f} ms/frame'
+        )
+
+    def load_frames(self, directory):
+        """Read recorded JPEG frames in name order"""
+        paths = sorted(Path(directory).glob('*.jp*g'))
+        return [path.read_bytes() for path in paths]
+
+    def synthetic_frames(self, count, motion_every):
+        """Mostly still 640x480 frames with sensor noise and periodic scene changes"""
+        rng = np.random.default_rng(0)
+        scene = cv2.GaussianBlur(rng.integers(0, 256, (480, 640), dtype=np.uint8), (0, 0), 8)
+
+        frames = []
+        for i in range(count):
+            shift = (i // max(motion_every, 1)) * 80
+            image = cv2.add(np.roll(scene, shift, axis=1), rng.integers(0, 4, scene.shape, dtype=np.uint8))
+            frames.append(cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 80])[1].tobytes())
+        return frames
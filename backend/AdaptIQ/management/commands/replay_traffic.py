@@ -0,0 +1,312 @@
+import cProfile
+import io
+import json
+import pstats
+import random
+import statistics
+import time
+from collections import defaultdict
+from pathlib import Path
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from AdaptIQ.middleware import selected_index, served_answers
+
+LOCAL_HOSTS = ('', 'localhost', '127.0.0.1', '::1')
+
+class Command(BaseCommand):
+    help = 'Replay traffic recorded by TrafficRecorderMiddleware against the local database and profile each endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('log', help='JSONL file written by TrafficRecorderMiddleware')
+        parser.add_argument(
+            '--speedup',
+            type=float,
+            default=1.0,
+            help='Replay this many times faster than recorded (0 = no delays)'
+        )
+        parser.add_argument(
+            '--profile',
+            choices=['none', 'cprofile', 'pyinstrument'],
+            default='none',
+            help='Profiler to run around each replayed request'
+        )
+        parser.add_argument(
+            '--profile-dir',
+            default='replay_profiles',
+            help='Where per-endpoint profiles are written'
+        )
+        parser.add_argument(
+            '--endpoint',
+            help='Only replay requests whose path contains this string'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Replay at most this many requests'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed, so question selection is repeatable between runs'
+        )
+        parser.add_argument(
+            '--host',
+            default='localhost',
+            help='Host header for replayed requests (must be in ALLOWED_HOSTS)'
+        )
+        parser.add_argument(
+            '--allow-remote-db',
+            action='store_true',
+            help='Replay even though the default database is not local'
+        )
+
+    def handle(self, *args, **options):
+        database = settings.DATABASES['default']
+        if (
+            'sqlite' not in database['ENGINE']
+            and database.get('HOST', '') not in LOCAL_HOSTS
+            and not options['allow_remote_db']
+        ):
+            raise CommandError(f'Refusing to replay against remote database host {database["HOST"]}')
+
+        records = self.load_records(options['log'], options['endpoint'], options['limit'])
+        if not records:
+            raise CommandError('No matching records to replay')
+
+        profilers = self.make_profilers(options['profile'])
+        profile_dir = Path(options['profile_dir'])
+
+        # Replayed requests must not be recorded again. They all come from one
+        # client, so rate limits are turned off or they would reject most of them
+        settings.ADAPTIQ_TRAFFIC_RECORDING = False
+        settings.ADAPTIQ_RATE_LIMITS = dict.fromkeys(settings.ADAPTIQ_RATE_LIMITS)
+        client = Client(HTTP_HOST=options['host'])
+        random.seed(options['seed'])
+
+        # Recorded id -> id handed out by this run, per field
+        ids = {'quiz_session_id': {}, 'question_id': {}}
+        # (quiz session id, question id) -> answers in the order they were served,
+        # as recorded and as served to this run
+        served = {'recorded': {}, 'replayed': {}}
+        users = {}  # recorded user id -> local User, or None if it does not exist here
+        logged_in = None
+        skipped_users = 0
+        latencies = defaultdict(list)
+        recorded = defaultdict(list)
+        mismatches = defaultdict(int)
+
+        self.stdout.write(f'Replaying {len(records)} requests...')
+        replay_started = time.monotonic()
+        first_ts = records[0]['ts']
+
+        for record in records:
+            if options['speedup'] > 0:
+                due = replay_started + (record['ts'] - first_ts) / options['speedup']
+                delay = due - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+
+            user_id = record.get('user_id')
+            if user_id is not None and user_id not in users:
+                users[user_id] = User.objects.filter(pk=user_id).first()
+            if user_id is not None and users[user_id] is None:
+                skipped_users += 1
+                continue
+            if user_id != logged_in:
+                if user_id is None:
+                    client.logout()
+                else:
+                    client.force_login(users[user_id])
+                logged_in = user_id
+
+            endpoint = f'{record["method"]} {record["path"]}'
+            profiler = profilers[endpoint] if profilers is not None else None
+            body = self.remap_body(record, ids, served)
+
+            started = time.perf_counter()
+            if profiler is not None:
+                profiler.start()
+            try:
+                response = self.send(client, record, body)
+            finally:
+                if profiler is not None:
+                    profiler.stop()
+            latencies[endpoint].append((time.perf_counter() - started) * 1000)
+            recorded[endpoint].append(record['duration_ms'])
+
+            if response.status_code != record['status']:
+                mismatches[endpoint] += 1
+            replayed = self.response_json(response)
+            self.map_ids(record.get('response'), replayed, ids)
+            served['recorded'].update(served_answers(record.get('body'), record.get('response')))
+            served['replayed'].update(served_answers(body, replayed))
+
+        if skipped_users:
+            self.stdout.write(self.style.WARNING(
+                f'Skipped {skipped_users} requests from users that do not exist in the local database'
+            ))
+        self.report(latencies, recorded, mismatches)
+        if profilers is not None:
+            self.write_profiles(profilers, profile_dir)
+
+    def load_records(self, path, endpoint, limit):
+        records = []
+        with open(path, encoding='utf-8') as log:
+            for line in log:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if endpoint and endpoint not in record['path']:
+                    continue
+                if record.get('body_omitted'):
+                    continue  # multipart uploads are not stored and cannot be replayed
+                records.append(record)
+                if limit and len(records) >= limit:
+                    break
+        records.sort(key=lambda record: record['ts'])
+        return records
+
+    def remap_body(self, record, ids, served):
+        """Copy a recorded body with ids and the selected answer mapped to this run's.
+
+        Answers are shuffled per response, so the recorded selected_answer is
+        replaced by the answer at the same position in the list this run was
+        served. Old recordings without selected_index get it derived from the
+        recorded responses.
+        """
+        body = record.get('body')
+        if not isinstance(body, dict):
+            return body
+
+        index = record.get('selected_index')
+        if index is None:
+            index = selected_index(body, served['recorded'])
+
+        body = dict(body)
+        for field in ('quiz_session_id', 'question_id'):
+            if body.get(field) in ids[field]:
+                body[field] = ids[field][body[field]]
+
+        answers = served['replayed'].get((str(body.get('quiz_session_id')), str(body.get('question_id'))))
+        if index is not None and answers is not None and index < len(answers):
+            body['selected_answer'] = answers[index]
+        return body
+
+    def send(self, client, record, body):
+        """Re-issue a recorded request with an already remapped body"""
+        path = record['path'] + (f'?{record["query"]}' if record.get('query') else '')
+        headers = {
+            'HTTP_' + name.upper().replace('-', '_'): value
+            for name, value in record.get('headers', {}).items()
+            if name != 'Content-Type'
+        }
+
+        if record['method'] == 'GET':
+            return client.get(path, **headers)
+        return client.generic(
+            record['method'], path,
+            json.dumps(body) if body is not None else '',
+            content_type='application/json',
+            **headers
+        )
+
+    def response_json(self, response):
+        if not response.get('Content-Type', '').startswith('application/json'):
+            return None
+        try:
+            return json.loads(response.content)
+        except ValueError:
+            return None
+
+    def map_ids(self, recorded, replayed, ids):
+        """Remember which quiz session and question ids this run handed out"""
+        if not isinstance(recorded, dict) or not isinstance(replayed, dict):
+            return
+        if 'quiz_session_id' in recorded and 'quiz_session_id' in replayed:
+            ids['quiz_session_id'][recorded['quiz_session_id']] = replayed['quiz_session_id']
+        for field in ('question', 'next_question'):
+            if isinstance(recorded.get(field), dict) and isinstance(replayed.get(field), dict):
+                ids['question_id'][recorded[field].get('id')] = replayed[field].get('id')
+
+    def make_profilers(self, kind):
+        if kind == 'none':
+            return None
+        if kind == 'cprofile':
+            return defaultdict(CProfileTimer)
+        try:
+            import pyinstrument  # noqa: F401
+        except ImportError:
+            raise CommandError('pyinstrument is not installed (pip install pyinstrument)')
+        return defaultdict(PyinstrumentTimer)
+
+    def report(self, latencies, recorded, mismatches):
+        self.stdout.write(self.style.SUCCESS('Latency per endpoint (ms): replayed p50/p95/max vs recorded p50'))
+        for endpoint in sorted(latencies):
+            values = sorted(latencies[endpoint])
+            p95 = values[min(int(len(values) * 0.95), len(values) - 1)]
+            line = (
+                f'  {endpoint}: n={len(values)} '
+                f'{statistics.median(values):.1f}/{p95:.1f}/{values[-1]:.1f} '
+                f'vs {statistics.median(recorded[endpoint]):.1f}'
+            )
+            if mismatches[endpoint]:
+                line += f' ({mismatches[endpoint]} status mismatches)'
+            self.stdout.write(line)
+
+    def write_profiles(self, profilers, profile_dir):
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        for endpoint, profiler in profilers.items():
+            name = endpoint.replace(' ', '_').strip('/').replace('/', '_')
+            path = profiler.write(profile_dir, name)
+            self.stdout.write(f'\n{endpoint} -> {path}')
+            self.stdout.write(profiler.summary())
+
+
+class CProfileTimer:
+    """Accumulates a cProfile over every request to one endpoint"""
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    def write(self, directory, name):
+        path = directory / f'{name}.prof'
+        self.profile.dump_stats(path)
+        return path
+
+    def summary(self):
+        """Top AdaptIQ functions by cumulative time"""
+        stream = io.StringIO()
+        pstats.Stats(self.profile, stream=stream).sort_stats('cumulative').print_stats('AdaptIQ', 15)
+        return stream.getvalue()
+
+
+class PyinstrumentTimer:
+    """Accumulates a pyinstrument session over every request to one endpoint"""
+
+    def __init__(self):
+        from pyinstrument import Profiler
+        self.profiler = Profiler()
+
+    def start(self):
+        self.profiler.start()
+
+    def stop(self):
+        self.profiler.stop()
+
+    def write(self, directory, name):
+        path = directory / f'{name}.html'
+        path.write_text(self.profiler.output_html(), encoding='utf-8')
+        return path
+
+    def summary(self):
+        return self.profiler.output_text()
@@ -0,0 +1,43 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from AdaptIQ import background
+
+class Command(BaseCommand):
+    help = 'Drain the durable (SQLite) background task queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once the queue is empty instead of polling'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait between polls when the queue is empty'
+        )
+
+    def handle(self, *args, **options):
+        if getattr(settings, 'ADAPTIQ_TASK_BACKEND', 'memory') != 'sqlite':
+            raise CommandError("Set ADAPTIQ_TASK_BACKEND = 'sqlite' to use the task worker")
+
+        task_queue = background.get_queue()
+        pending, dead = task_queue.counts()
+        self.stdout.write(self.style.SUCCESS(f'Task worker started: {pending} pending, {dead} dead jobs'))
+
+        processed = 0
+        try:
+            while True:
+                claimed = task_queue.process_once()
+                processed += claimed
+                if claimed:
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f'Task worker stopped after {processed} jobs'))
@@ -0,0 +1,116 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter so that import and cache costs are really cold
+CHILD_SCRIPT = '''
+import json, os, time
+started = time.perf_counter()
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'quiz_backend.settings')
+import django
+from django.conf import settings
+settings.ADAPTIQ_WARM_START = {warm}
+settings.ADAPTIQ_TASK_BACKEND = 'null'  # keep the timed answers out of QuestionStats
+django.setup()
+from AdaptIQ.warmup import warm_start_if_enabled  # what the WSGI entry point does
+warm_start_if_enabled()
+boot = time.perf_counter() - started
+from AdaptIQ.management.commands.warm_start_report import time_requests
+print(json.dumps({{'boot': boot, 'requests': time_requests({category!r}, {requests})}}))
+'''
+
+
+def time_requests(category, count):
+    """Drive start-quiz/submit-answer through the views and time each call"""
+    from django.test import RequestFactory
+
+    factory = RequestFactory()
+    views = None
+    timings = []
+    session_id = None
+    question = None
+
+    for _ in range(count):
+        if question is None:
+            request = factory.post('/api/quiz/start-quiz/', {'category': category}, content_type='application/json')
+            started = time.perf_counter()
+            if views is None:
+                # Imported inside the timed block so the first request pays for lazy imports
+                from AdaptIQ import views
+            response = views.start_quiz(request)
+            response.render()
+            timings.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                break
+            session_id = response.data['quiz_session_id']
+            question = response.data['question']
+            continue
+
+        request = factory.post('/api/quiz/submit-answer/', {
+            'quiz_session_id': session_id,
+            'question_id': question['id'],
+            'selected_answer': question['answers'][0],
+        }, content_type='application/json')
+        started = time.perf_counter()
+        response = views.submit_answer(request)
+        response.render()
+        timings.append(time.perf_counter() - started)
+        question = response.data.get('next_question') if response.status_code == 200 else None
+
+    return timings
+
+
+class Command(BaseCommand):
+    help = 'Compare worker boot and first-request timings with and without warm start'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--category',
+            default='computer',
+            help='Quiz category used for the timed requests'
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=10,
+            help='Number of requests to time per worker'
+        )
+
+    def handle(self, *args, **options):
+        category = options['category']
+        count = options['requests']
+        if count < 1:
+            raise CommandError('--requests must be at least 1')
+
+        for label, warm in [('cold', False), ('warm', True)]:
+            result = self.run_worker(warm, category, count)
+            timings = result['requests']
+
+            self.stdout.write(self.style.SUCCESS(f'{label} worker:'))
+            self.stdout.write(f'  boot (import + setup): {result["boot"] * 1000:.1f} ms')
+            if not timings:
+                self.stdout.write(self.style.WARNING('  no requests completed'))
+                continue
+            self.stdout.write(f'  first request:         {timings[0] * 1000:.1f} ms')
+            if len(timings) > 1:
+                self.stdout.write(f'  median of the rest:    {statistics.median(timings[1:]) * 1000:.1f} ms')
+            self.stdout.write(f'  ready to serve after:  {(result["boot"] + timings[0]) * 1000:.1f} ms')
+
+    def run_worker(self, warm, category, count):
+        """Boot a fresh interpreter and collect its timings"""
+        script = CHILD_SCRIPT.format(warm=warm, category=category, requests=count)
+        completed = subprocess.run(
+            [sys.executable, '-c', script],
+            cwd=settings.BASE_DIR,
+            env=os.environ.copy(),
+            capture_output=True,
+            text=True,
+        )
+        if completed.returncode != 0:
+            raise CommandError(f'Worker failed:\n{completed.stderr}')
+        return json.loads(completed.stdout.strip().splitlines()[-1])
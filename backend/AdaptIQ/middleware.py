@@ -0,0 +1,132 @@
+import json
+import random
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+# Request headers worth replaying; everything else (cookies, auth) is dropped
+RECORDED_HEADERS = ['Content-Type', 'Accept', 'Idempotency-Key', 'If-None-Match', 'If-Modified-Since']
+
+# Served answer lists remembered per worker to record which one was picked
+MAX_SERVED_QUESTIONS = 10000
+
+
+def sanitize(value, redact):
+    """Copy a JSON value with sensitive keys masked and long strings cut"""
+    if isinstance(value, dict):
+        return {
+            key: '[redacted]' if key in redact else sanitize(item, redact)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [sanitize(item, redact) for item in value]
+    if isinstance(value, str) and len(value) > 1000:
+        return value[:1000] + '...'
+    return value
+
+
+def decode_json(content_type, body):
+    """Parse a JSON body, or None if it is not JSON"""
+    if not content_type.startswith('application/json') or not body:
+        return None
+    try:
+        return json.loads(body)
+    except ValueError:
+        return None
+
+
+def served_answers(request_body, response_data):
+    """Map (quiz session id, question id) to the answers a response served, in order"""
+    if not isinstance(response_data, dict):
+        return {}
+    quiz_session_id = response_data.get('quiz_session_id')
+    if quiz_session_id is None and isinstance(request_body, dict):
+        quiz_session_id = request_body.get('quiz_session_id')
+
+    served = {}
+    for field in ('question', 'next_question'):
+        question = response_data.get(field)
+        if isinstance(question, dict) and isinstance(question.get('answers'), list):
+            served[(str(quiz_session_id), str(question.get('id')))] = question['answers']
+    return served
+
+
+def selected_index(body, served):
+    """Position of the body's selected_answer in the answers served for its question, or None"""
+    if not isinstance(body, dict) or 'selected_answer' not in body:
+        return None
+    answers = served.get((str(body.get('quiz_session_id')), str(body.get('question_id'))))
+    if answers is None or body['selected_answer'] not in answers:
+        return None
+    return answers.index(body['selected_answer'])
+
+
+class TrafficRecorderMiddleware:
+    """Append sanitized request/response pairs for the API to a JSONL file.
+
+    Enabled with ADAPTIQ_TRAFFIC_RECORDING; replay the file with
+    ``manage.py replay_traffic``. Multipart bodies (camera frames) are not
+    stored, only their size. Answers are shuffled per response, so answer
+    submissions also record ``selected_index``, the position of the chosen
+    answer in the list this worker served.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'ADAPTIQ_TRAFFIC_RECORDING', False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.path = settings.ADAPTIQ_TRAFFIC_LOG_PATH
+        self.prefix = getattr(settings, 'ADAPTIQ_TRAFFIC_PATH_PREFIX', '/api/quiz/')
+        self.sample_rate = getattr(settings, 'ADAPTIQ_TRAFFIC_SAMPLE_RATE', 1.0)
+        self.redact = set(getattr(settings, 'ADAPTIQ_TRAFFIC_REDACT_FIELDS', []))
+        self.lock = threading.Lock()
+        self.served = OrderedDict()  # (quiz session id, question id) -> answers
+
+    def __call__(self, request):
+        if not request.path.startswith(self.prefix) or random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        content_type = request.META.get('CONTENT_TYPE', '')
+        if content_type.startswith('multipart/'):
+            # Do not pull uploaded frames into memory just to log them
+            body, omitted = None, f'multipart ({request.META.get("CONTENT_LENGTH", "?")} bytes)'
+        else:
+            body = decode_json(content_type, request.body)
+            omitted = None if body is not None or not request.body else 'non-json body'
+
+        started = time.time()
+        response = self.get_response(request)
+        duration_ms = (time.time() - started) * 1000
+
+        user = getattr(request, 'user', None)
+        response_type = response.get('Content-Type', '')
+        response_data = decode_json(response_type, getattr(response, 'content', b'') if not response.streaming else b'')
+        with self.lock:
+            index = selected_index(body, self.served)
+            self.served.update(served_answers(body, response_data))
+            while len(self.served) > MAX_SERVED_QUESTIONS:
+                self.served.popitem(last=False)
+
+        record = {
+            'ts': started,
+            'method': request.method,
+            'path': request.path,
+            'query': request.META.get('QUERY_STRING', ''),
+            'headers': {name: request.headers[name] for name in RECORDED_HEADERS if name in request.headers},
+            'body': sanitize(body, self.redact),
+            'body_omitted': omitted,
+            'selected_index': index,
+            'user_id': user.pk if user is not None and user.is_authenticated else None,
+            'status': response.status_code,
+            'response': sanitize(response_data, self.redact),
+            'duration_ms': round(duration_ms, 3),
+        }
+
+        line = json.dumps(record, default=str)
+        with self.lock:
+            with open(self.path, 'a', encoding='utf-8') as log:
+                log.write(line + '\n')
+        return response
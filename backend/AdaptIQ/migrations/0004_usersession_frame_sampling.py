@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AdaptIQ', '0003_usersession'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usersession',
+            name='frame_sample_rate',
+            field=models.FloatField(default=2.0),
+        ),
+        migrations.AddField(
+            model_name='usersession',
+            name='motion_threshold',
+            field=models.FloatField(default=6.0),
+        ),
+        migrations.AddField(
+            model_name='usersession',
+            name='max_detection_interval',
+            field=models.FloatField(default=5.0),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AdaptIQ', '0005_questionstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizsession',
+            name='practice_pack_id',
+            field=models.CharField(blank=True, max_length=32, null=True, unique=True),
+        ),
+    ]
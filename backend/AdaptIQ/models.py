@@ -29,6 +29,7 @@ class QuizSession(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    practice_pack_id = models.CharField(max_length=32, unique=True, null=True, blank=True)  # Set for uploaded offline packs
     
     def update_difficulty(self, is_correct):
         """Rule-based AI: Update difficulty based on user performance"""
@@ -110,11 +111,21 @@ class UserSession(models.Model):
     is_cheating_detected = models.BooleanField(default=False)
     camera_feed_active = models.BooleanField(default=False)
     
+    # Server-side frame analysis tuning
+    frame_sample_rate = models.FloatField(default=2.0)  # max frames analysed per second
+    motion_threshold = models.FloatField(default=6.0)  # mean pixel change (0-255) that triggers detection
+    max_detection_interval = models.FloatField(default=5.0)  # seconds before detection runs regardless of motion
+    
     # Warning details
     warning_history = models.JSONField(default=list)  # Store warning timestamps and reasons
     
-    def add_warning(self, warning_type, reason):
-        """Add a warning and check if quiz should be terminated"""
+    def add_warning(self, warning_type, reason, defer_history=False):
+        """Add a warning and check if quiz should be terminated
+        
+        With defer_history the entry is only kept on self.last_warning for the
+        caller to queue (see tasks.append_warning_history); warning_history
+        itself is left untouched.
+        """
         self.movement_warnings += 1
         
         warning_data = {
@@ -124,7 +135,9 @@ class UserSession(models.Model):
             'warning_number': self.movement_warnings
         }
         
-        self.warning_history.append(warning_data)
+        self.last_warning = warning_data
+        if not defer_history:
+            self.warning_history.append(warning_data)
         
         # Check if this is the 3rd warning (force quit)
         if self.movement_warnings >= 3:
@@ -134,7 +147,10 @@ class UserSession(models.Model):
                 self.quiz_session.is_active = False
                 self.quiz_session.save()
         
-        self.save()
+        if defer_history:
+            self.save(update_fields=['movement_warnings', 'is_cheating_detected', 'session_end'])
+        else:
+            self.save()
         return self.movement_warnings >= 3  # Returns True if should force quit
     
     def reset_warnings(self):
@@ -155,4 +171,14 @@ class KidMode(models.Model):
     time_limit_per_question = models.IntegerField(default=60)  # seconds
     
     def __str__(self):
-        return f"{self.user.username} - Kid Mode: {'Enabled' if self.is_enabled else 'Disabled'}" 
\ No newline at end of file
+        return f"{self.user.username} - Kid Mode: {'Enabled' if self.is_enabled else 'Disabled'}"
+
+class QuestionStats(models.Model):
+    """Answer counts per question, rolled up in the background (see tasks.py)"""
+    question = models.OneToOneField(Question, on_delete=models.CASCADE, related_name='stats')
+    times_answered = models.IntegerField(default=0)
+    times_correct = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.question.question_text[:30]} - {self.times_correct}/{self.times_answered} correct"
@@ -0,0 +1,137 @@
+"""Offline practice packs.
+
+A pack is a set of questions across difficulties plus the adaptive rule
+parameters, serialized with django.core.signing (zlib-compressed JSON,
+HMAC-signed with SECRET_KEY). The client plays it offline and uploads the
+answers in the order it played them; the server re-runs the adaptive rules
+over that sequence before storing anything.
+"""
+import random
+import uuid
+
+from django.conf import settings
+from django.core import signing
+
+from . import kid_mode, question_cache
+
+PACK_SALT = 'AdaptIQ.practice_pack'
+DIFFICULTY_POINTS = {'easy': 5, 'medium': 10, 'hard': 20}
+STREAK_TO_CHANGE = 2  # consecutive answers before the difficulty moves
+MAX_QUESTIONS = 10
+
+
+class PackError(Exception):
+    """An uploaded pack or its answer sequence failed verification"""
+
+
+def build_pack(user_id, category, per_difficulty, policy=None):
+    """Return (pack payload, signed token) for a category"""
+    questions = []
+    for difficulty in kid_mode.DIFFICULTY_LEVELS:
+        if not kid_mode.allows(policy, difficulty):
+            continue
+        pool = question_cache.get_id_pool(category, difficulty)
+        for question_id in random.sample(pool, min(per_difficulty, len(pool))):
+            question = question_cache.get_question(question_id)
+            if question is not None:
+                questions.append(dict(question))
+
+    rules = {
+        'start_difficulty': kid_mode.cap_difficulty(policy, 'medium'),
+        'max_difficulty': kid_mode.cap_difficulty(policy, 'hard'),
+        'points': DIFFICULTY_POINTS,
+        'streak_to_change': STREAK_TO_CHANGE,
+        'max_questions': MAX_QUESTIONS,
+    }
+    pack = {
+        'pack_id': uuid.uuid4().hex,
+        'user_id': user_id,
+        'category': category,
+        'rules': rules,
+        'questions': questions,
+    }
+    return pack, signing.dumps(pack, salt=PACK_SALT, compress=True)
+
+
+def load_pack(token, user_id):
+    """Verify a pack token's signature, age and owner, and return the pack"""
+    if not isinstance(token, str) or not token:
+        raise PackError('A practice pack is required')
+    try:
+        pack = signing.loads(token, salt=PACK_SALT, max_age=settings.ADAPTIQ_PRACTICE_PACK_MAX_AGE)
+    except signing.SignatureExpired:
+        raise PackError('Practice pack has expired')
+    except signing.BadSignature:
+        raise PackError('Invalid practice pack signature')
+
+    if pack['user_id'] != user_id:
+        raise PackError('Practice pack belongs to another user')
+    return pack
+
+
+def replay(pack, answers):
+    """Re-run the pack's adaptive rules over the played answers.
+
+    Every answer must be for a question in the pack, answered once, at the
+    difficulty the rules had reached at that point. Returns (session totals,
+    per-answer results).
+    """
+    rules = pack['rules']
+    questions = {question['id']: question for question in pack['questions']}
+    if len(answers) > rules['max_questions']:
+        raise PackError(f'At most {rules["max_questions"]} answers per pack')
+
+    levels = kid_mode.DIFFICULTY_LEVELS
+    level = levels.index(rules['start_difficulty'])
+    max_level = levels.index(rules['max_difficulty'])
+    consecutive_correct = consecutive_incorrect = total_score = 0
+    seen = set()
+    results = []
+
+    for index, answer in enumerate(answers):
+        if not isinstance(answer, dict):
+            raise PackError(f'Answer {index}: must be an object')
+        question = questions.get(answer.get('question_id'))
+        if question is None:
+            raise PackError(f'Answer {index}: question is not in this pack')
+        if question['id'] in seen:
+            raise PackError(f'Answer {index}: question was already answered')
+        difficulty = levels[level]
+        if question['difficulty'] != difficulty:
+            raise PackError(f'Answer {index}: expected a {difficulty} question')
+        seen.add(question['id'])
+
+        selected_answer = str(answer.get('selected_answer', ''))[:255]
+        is_correct = selected_answer == question['correct_answer']
+        points_earned = rules['points'][difficulty] if is_correct else 0
+        total_score += points_earned
+        results.append({
+            'question_id': question['id'],
+            'selected_answer': selected_answer,
+            'is_correct': is_correct,
+            'points_earned': points_earned,
+            'difficulty_at_time': difficulty,
+        })
+
+        # Same rules as QuizSession.update_difficulty, capped at max_difficulty
+        if is_correct:
+            consecutive_correct += 1
+            consecutive_incorrect = 0
+            if consecutive_correct >= rules['streak_to_change'] and level < max_level:
+                level += 1
+                consecutive_correct = 0
+        else:
+            consecutive_incorrect += 1
+            consecutive_correct = 0
+            if consecutive_incorrect >= rules['streak_to_change'] and level > 0:
+                level -= 1
+                consecutive_incorrect = 0
+
+    totals = {
+        'current_difficulty': levels[level],
+        'consecutive_correct': consecutive_correct,
+        'consecutive_incorrect': consecutive_incorrect,
+        'total_questions_answered': len(results),
+        'total_score': total_score,
+    }
+    return totals, results
@@ -0,0 +1,352 @@
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import close_old_connections, transaction
+
+from . import background, face_detection
+from .models import UserSession
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers (None when empty)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class MotionGate:
+    """Per-session frame sampling and motion gating.
+
+    A frame is analysed only if it is not sampled out by ``sample_rate`` and
+    either differs from the last analysed frame by more than
+    ``motion_threshold`` or ``max_interval`` seconds have passed since the
+    last detection.
+    """
+
+    # Skip reasons returned by check()
+    SAMPLED_OUT = 'sampled_out'
+    STILL = 'still'
+    UNDECODABLE = 'undecodable'
+
+    def __init__(self, sample_rate=2.0, motion_threshold=6.0, max_interval=5.0):
+        self.lock = threading.Lock()
+        self.configure(sample_rate, motion_threshold, max_interval)
+        self.last_sampled = None
+        self.last_detected = None
+        self.last_used = time.monotonic()
+        self.reference = None  # thumbnail of the last analysed frame
+
+    def configure(self, sample_rate, motion_threshold, max_interval):
+        self.sample_interval = 1 / sample_rate if sample_rate > 0 else 0
+        self.motion_threshold = motion_threshold
+        self.max_interval = max_interval
+
+    def check(self, frame, timestamp, sample=True):
+        """Return (skip reason or None, thumbnail). Call commit() if the frame is analysed
+
+        With ``sample=False`` the frame is never sampled out, only motion gated.
+        """
+        if sample and self.last_sampled is not None and timestamp - self.last_sampled < self.sample_interval:
+            return self.SAMPLED_OUT, None
+        self.last_sampled = timestamp
+
+        thumbnail = face_detection.motion_thumbnail(frame)
+        if thumbnail is None:
+            return self.UNDECODABLE, None
+
+        if (
+            self.reference is not None
+            and timestamp - self.last_detected < self.max_interval
+            and face_detection.frame_difference(thumbnail, self.reference) < self.motion_threshold
+        ):
+            return self.STILL, thumbnail
+        return None, thumbnail
+
+    def commit(self, thumbnail, timestamp):
+        self.reference = thumbnail
+        self.last_detected = timestamp
+
+
+class FramePipeline:
+    """Bounded queue of uploaded frames feeding a CPU process pool.
+
+    Frames beyond ``queue_size`` in flight are dropped rather than queued, so a
+    burst of uploads can never back up the web workers. Detection results come
+    back on the executor's callback thread, which only updates counters;
+    warnings are written to the database by a separate writer thread so a slow
+    query never stalls result handling.
+    """
+
+    def __init__(self, workers=None, queue_size=32, missing_face_frames=3, idle_ttl=300):
+        # Fail here, once, rather than in every spawned worker on its first frame
+        try:
+            face_detection.check_support()
+        except (ImportError, RuntimeError) as e:
+            raise ImproperlyConfigured(f'Server-side proctoring is unavailable: {e}') from e
+
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.missing_face_frames = missing_face_frames
+        self.idle_ttl = idle_ttl  # seconds before an idle session's state is forgotten
+        self._purged_at = time.monotonic()
+        self._executor = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._missing = {}  # user session id -> consecutive frames without a face
+        self._gates = {}  # user session id -> MotionGate
+        self._warnings = queue.Queue()  # (user session id, type, reason) to write
+        self._warning_thread = None
+
+        # Metrics
+        self.processed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.skipped = {MotionGate.SAMPLED_OUT: 0, MotionGate.STILL: 0, MotionGate.UNDECODABLE: 0}
+        self.latencies_ms = deque(maxlen=1000)  # upload -> result, per frame
+        self.detect_ms = deque(maxlen=1000)     # time spent inside the worker
+
+    def _get_executor(self):
+        if self._executor is None:
+            # spawn, not fork: the web process has threads and open DB connections
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=face_detection.init_worker,
+            )
+        return self._executor
+
+    def get_gate(self, user_session):
+        """Return the session's motion gate, tuned from its UserSession fields"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._purged_at > self.idle_ttl / 2:
+                self._purge_idle(now)
+            gate = self._gates.get(user_session.id)
+            if gate is None:
+                gate = self._gates[user_session.id] = MotionGate()
+            gate.last_used = now
+        gate.configure(
+            user_session.frame_sample_rate,
+            user_session.motion_threshold,
+            user_session.max_detection_interval,
+        )
+        return gate
+
+    def _purge_idle(self, now):
+        """Drop state of sessions not seen for idle_ttl seconds (caller holds _lock)"""
+        for user_session_id in [i for i, gate in self._gates.items() if now - gate.last_used > self.idle_ttl]:
+            del self._gates[user_session_id]
+        for user_session_id in [i for i in self._missing if i not in self._gates]:
+            del self._missing[user_session_id]
+        self._purged_at = now
+
+    def forget(self, user_session_id):
+        """Drop a session's motion gate and face-less frame count"""
+        with self._lock:
+            self._gates.pop(user_session_id, None)
+            self._missing.pop(user_session_id, None)
+
+    def submit(self, user_session, frames, timestamps=None):
+        """Queue JPEG frames for detection. Returns (accepted, dropped, skipped)
+
+        ``timestamps`` are capture times in seconds. Without them every frame
+        gets the arrival time, so sampling can only tell batches apart: the
+        first frame of the batch is sampled as usual and the rest are only
+        motion gated.
+        """
+        user_session_id = user_session.id
+        gate = self.get_gate(user_session)
+        captured = timestamps is not None
+        if not captured:
+            timestamps = [time.time()] * len(frames)
+        accepted = dropped = skipped = 0
+
+        for index, (frame, timestamp) in enumerate(zip(frames, timestamps)):
+            with gate.lock:
+                reason, thumbnail = gate.check(frame, timestamp, sample=captured or index == 0)
+                if reason is None:
+                    with self._lock:
+                        full = self._in_flight >= self.queue_size
+                        if full:
+                            self.dropped += 1
+                        else:
+                            self._in_flight += 1
+                            executor = self._get_executor()
+                    if not full:
+                        gate.commit(thumbnail, timestamp)
+
+            if reason is not None:
+                with self._lock:
+                    self.skipped[reason] += 1
+                skipped += 1
+                continue
+            if full:
+                dropped += 1
+                continue
+
+            submitted = time.perf_counter()
+            try:
+                future = executor.submit(face_detection.detect_faces, frame)
+            except BrokenProcessPool:
+                logger.exception('Proctoring worker pool died, restarting it')
+                self._reset_executor(executor)
+                with self._lock:
+                    self._in_flight -= 1
+                    self.failed += 1
+                continue
+
+            future.add_done_callback(
+                lambda f, submitted=submitted, executor=executor: self._on_result(user_session_id, submitted, f, executor)
+            )
+            accepted += 1
+
+        return accepted, dropped, skipped
+
+    def _reset_executor(self, executor):
+        """Forget a broken pool so the next submit builds a new one"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+
+    def _on_result(self, user_session_id, submitted, future, executor=None):
+        latency_ms = (time.perf_counter() - submitted) * 1000
+        with self._lock:
+            self._in_flight -= 1
+
+        try:
+            result = future.result()
+        except BrokenProcessPool:
+            logger.exception('Proctoring worker pool died, it will be rebuilt on the next upload')
+            self._reset_executor(executor)
+            result = {'error': 'worker_failed'}
+        except Exception:
+            logger.exception('Face detection failed for user session %s', user_session_id)
+            result = {'error': 'worker_failed'}
+
+        with self._lock:
+            if 'error' in result:
+                self.failed += 1
+                return
+            self.processed += 1
+            self.latencies_ms.append(latency_ms)
+            self.detect_ms.append(result['detect_ms'])
+
+        self.record_detection(user_session_id, result['faces'])
+
+    def record_detection(self, user_session_id, faces):
+        """Track consecutive face-less frames and warn once the limit is hit"""
+        with self._lock:
+            if faces:
+                self._missing.pop(user_session_id, None)
+                return
+            missing = self._missing.get(user_session_id, 0) + 1
+            if missing < self.missing_face_frames:
+                self._missing[user_session_id] = missing
+                return
+            self._missing.pop(user_session_id, None)
+
+        self.queue_warning(
+            user_session_id,
+            'left_frame',
+            f'No face detected in {missing} consecutive frames'
+        )
+
+    def queue_warning(self, user_session_id, warning_type, reason):
+        """Hand a warning to the writer thread, starting it if needed"""
+        self._warnings.put((user_session_id, warning_type, reason))
+        with self._lock:
+            if self._warning_thread is None or not self._warning_thread.is_alive():
+                self._warning_thread = threading.Thread(
+                    target=self._write_warnings, name='adaptiq-proctoring-warnings', daemon=True
+                )
+                self._warning_thread.start()
+
+    def _write_warnings(self):
+        while True:
+            warning = self._warnings.get()
+            try:
+                self.add_warning(*warning)
+            except Exception:
+                logger.exception('Could not record proctoring warning for user session %s', warning[0])
+
+    def add_warning(self, user_session_id, warning_type, reason):
+        """Record a warning on the UserSession (runs on the writer thread)
+
+        Takes the same row lock and deferred history path as
+        report_movement_violation, so warnings from both never overwrite each
+        other's counts.
+        """
+        close_old_connections()
+        try:
+            with transaction.atomic():
+                user_session = UserSession.objects.select_for_update().get(id=user_session_id)
+                ended = user_session.is_cheating_detected
+                if not ended:
+                    ended = user_session.add_warning(warning_type, reason, defer_history=True)
+                    background.enqueue('warning_history', {
+                        'user_session_id': user_session.id,
+                        'warning': user_session.last_warning
+                    })
+        except UserSession.DoesNotExist:
+            ended = True
+        finally:
+            close_old_connections()
+
+        if ended:
+            # The session is over, so its gate and counters will not be needed again
+            self.forget(user_session_id)
+
+    def metrics(self):
+        with self._lock:
+            latencies = list(self.latencies_ms)
+            detect = list(self.detect_ms)
+            return {
+                'workers': self.workers,
+                'queue_size': self.queue_size,
+                'in_flight': self._in_flight,
+                'processed': self.processed,
+                'dropped': self.dropped,
+                'failed': self.failed,
+                'skipped': dict(self.skipped),
+                'latency_ms_p50': percentile(latencies, 0.5),
+                'latency_ms_p95': percentile(latencies, 0.95),
+                'detect_ms_p50': percentile(detect, 0.5),
+                'detect_ms_p95': percentile(detect, 0.95),
+            }
+
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def get_pipeline():
+    """Return this process's frame pipeline, built from settings on first use"""
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                _pipeline = FramePipeline(
+                    workers=getattr(settings, 'ADAPTIQ_PROCTORING_WORKERS', None),
+                    queue_size=getattr(settings, 'ADAPTIQ_PROCTORING_QUEUE_SIZE', 32),
+                    missing_face_frames=getattr(settings, 'ADAPTIQ_PROCTORING_MISSING_FACE_FRAMES', 3),
+                    idle_ttl=getattr(settings, 'ADAPTIQ_PROCTORING_IDLE_TTL', 300),
+                )
+    return _pipeline
+
+
+def forget_session(user_session_id):
+    """Drop a session's gate and counters, if this process has a pipeline"""
+    if _pipeline is not None:
+        _pipeline.forget(user_session_id)
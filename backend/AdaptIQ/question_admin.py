@@ -0,0 +1,153 @@
+"""Bulk question writes for the admin endpoints.
+
+Rows arrive already validated; each helper applies them in chunked
+transactions with bulk_create/bulk_update/update and sends a single
+questions_changed signal per batch (bulk writes do not fire post_save).
+"""
+from django.conf import settings
+from django.db import transaction
+
+from .models import Question
+from .signals import questions_changed
+
+UPSERT_FIELDS = ['question_text', 'category', 'difficulty', 'correct_answer', 'incorrect_answers', 'is_active', 'api_question_id']
+
+
+def chunks(items, size=None):
+    size = size or getattr(settings, 'ADAPTIQ_BULK_CHUNK_SIZE', 500)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def find_duplicates(values):
+    seen, duplicates = set(), set()
+    for value in values:
+        if value in seen:
+            duplicates.add(value)
+        seen.add(value)
+    return duplicates
+
+
+def plan_upsert(rows):
+    """Match rows to existing questions by id, then api_question_id.
+
+    Returns (to_create, to_update, errors) where errors maps row index to a
+    message. Costs at most two queries whatever the batch size.
+    """
+    errors = {}
+
+    for field in ('id', 'api_question_id'):
+        duplicates = find_duplicates(row[field] for row in rows if row.get(field) is not None)
+        for index, row in enumerate(rows):
+            if row.get(field) in duplicates:
+                errors[index] = f'Duplicate {field} {row[field]} in batch'
+
+    by_id = Question.objects.in_bulk([row['id'] for row in rows if row.get('id')])
+    by_api_id = Question.objects.in_bulk(
+        [row['api_question_id'] for row in rows if row.get('api_question_id') is not None],
+        field_name='api_question_id'
+    )
+
+    matches = {}  # row index -> existing question, or None to create
+    for index, row in enumerate(rows):
+        if index in errors:
+            continue
+        if row.get('id'):
+            question = by_id.get(row['id'])
+            if question is None:
+                errors[index] = f'Question {row["id"]} does not exist'
+                continue
+            owner = by_api_id.get(row.get('api_question_id'))
+            if owner is not None and owner.id != question.id:
+                errors[index] = f'api_question_id {row["api_question_id"]} belongs to question {owner.id}'
+                continue
+        else:
+            question = by_api_id.get(row.get('api_question_id'))
+        matches[index] = question
+
+    # One row matched by id and another by api_question_id can hit the same question
+    rows_by_question = {}
+    for index, question in matches.items():
+        if question is not None:
+            rows_by_question.setdefault(question.id, []).append(index)
+    for question_id, indexes in rows_by_question.items():
+        if len(indexes) > 1:
+            for index in indexes:
+                errors[index] = f'Question {question_id} is matched by more than one row'
+
+    to_create, to_update = [], []
+    for index, question in matches.items():
+        if index in errors:
+            continue
+        row = rows[index]
+        if question is None:
+            values = {field: row.get(field) for field in UPSERT_FIELDS}
+            values['is_active'] = row.get('is_active', True)
+            to_create.append(Question(**values))
+        else:
+            # Fields left out of the row (is_active included) keep their current value
+            for field in UPSERT_FIELDS:
+                if field in row:
+                    setattr(question, field, row[field])
+            to_update.append(question)
+
+    return to_create, to_update, errors
+
+
+def apply_upsert(to_create, to_update):
+    """Write planned creates and updates. Returns (created, updated)"""
+    created = updated = 0
+    try:
+        for chunk in chunks(to_create):
+            with transaction.atomic():
+                Question.objects.bulk_create(chunk)
+            created += len(chunk)
+        for chunk in chunks(to_update):
+            with transaction.atomic():
+                Question.objects.bulk_update(chunk, UPSERT_FIELDS)
+            updated += len(chunk)
+    finally:
+        if created or updated:
+            questions_changed.send(sender=Question)
+    return created, updated
+
+
+def set_active(question_ids, is_active):
+    """Activate or deactivate questions. Returns the number of rows changed"""
+    changed = 0
+    try:
+        for chunk in chunks(question_ids):
+            with transaction.atomic():
+                changed += Question.objects.filter(id__in=chunk).update(is_active=is_active)
+    finally:
+        if changed:
+            questions_changed.send(sender=Question)
+    return changed
+
+
+def recategorize(changes):
+    """Apply per-question category/difficulty changes. Returns (changed, missing ids)"""
+    existing = Question.objects.in_bulk([change['id'] for change in changes])
+    missing = [change['id'] for change in changes if change['id'] not in existing]
+
+    questions, fields = [], set()
+    for change in changes:
+        question = existing.get(change['id'])
+        if question is None:
+            continue
+        for field in ('category', 'difficulty'):
+            if field in change:
+                setattr(question, field, change[field])
+                fields.add(field)
+        questions.append(question)
+
+    changed = 0
+    try:
+        for chunk in chunks(questions):
+            with transaction.atomic():
+                Question.objects.bulk_update(chunk, sorted(fields))
+            changed += len(chunk)
+    finally:
+        if changed:
+            questions_changed.send(sender=Question)
+    return changed, missing
@@ -0,0 +1,195 @@
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+
+from . import http_cache
+from .models import Question
+from .sampling import AliasTable
+from .serializers import QuestionSerializer
+
+logger = logging.getLogger(__name__)
+
+# In-process caches. Filled by the warm start hook or lazily on first use,
+# and dropped whenever a Question is saved or deleted (see signals.py). Other
+# workers notice the change through the shared http_cache.QUESTION version,
+# which needs CACHES['default'] to be a backend shared by every worker; the
+# TTL bounds staleness if it is not.
+_lock = threading.Lock()
+_loaded_version = None      # http_cache.QUESTION version the caches belong to
+_loaded_at = 0
+_checked_at = 0
+_id_pools = None            # (category, difficulty) -> [question ids]
+_category_metadata = None   # category -> {'total': n, 'difficulties': {...}}
+_questions = {}             # question id -> serialized question dict
+_alias_tables = {}          # bucket weights -> (non-empty buckets, AliasTable)
+
+
+def _load_id_pools():
+    """Build the (category, difficulty) -> id list pools for active questions"""
+    pools = {}
+    rows = Question.objects.filter(is_active=True).values_list('id', 'category', 'difficulty')
+    for question_id, category, difficulty in rows:
+        pools.setdefault((category, difficulty), []).append(question_id)
+    return pools
+
+
+def _build_category_metadata(pools):
+    """Summarise the id pools into per-category counts"""
+    metadata = {}
+    for (category, difficulty), ids in pools.items():
+        entry = metadata.setdefault(category, {'total': 0, 'difficulties': {}})
+        entry['difficulties'][difficulty] = len(ids)
+        entry['total'] += len(ids)
+    return metadata
+
+
+def _check_freshness():
+    """Drop the caches if questions changed in any process, or they are too old"""
+    global _loaded_version, _loaded_at, _checked_at
+    now = time.monotonic()
+    if now - _checked_at < getattr(settings, 'ADAPTIQ_QUESTION_CACHE_CHECK_INTERVAL', 1):
+        return
+    _checked_at = now
+
+    version = http_cache.get_versions(http_cache.QUESTION)[http_cache.QUESTION]
+    if version != _loaded_version or now - _loaded_at > getattr(settings, 'ADAPTIQ_QUESTION_CACHE_TTL', 300):
+        invalidate()
+        _loaded_version = version
+        _loaded_at = now
+
+
+def get_id_pools():
+    """Return every (category, difficulty) id pool, loading them if needed"""
+    global _id_pools, _category_metadata
+    _check_freshness()
+    pools = _id_pools
+    if pools is None:
+        with _lock:
+            if _id_pools is None:
+                _id_pools = _load_id_pools()
+                _category_metadata = _build_category_metadata(_id_pools)
+            pools = _id_pools
+    return pools
+
+
+def get_id_pool(category, difficulty):
+    """Return the ids of active questions for a category and difficulty"""
+    return get_id_pools().get((category, difficulty), [])
+
+
+def get_category_metadata():
+    """Return per-category question counts"""
+    get_id_pools()
+    return _category_metadata or {}
+
+
+def get_question(question_id):
+    """Return the serialized question for an id, or None if it does not exist"""
+    try:
+        question_id = int(question_id)
+    except (TypeError, ValueError):
+        return None
+
+    _check_freshness()
+    question = _questions.get(question_id)
+    if question is None:
+        question = (
+            Question.objects.filter(id=question_id)
+            .values(*QuestionSerializer.Meta.fields)
+            .first()
+        )
+        if question is not None:
+            _questions[question_id] = question
+    return question
+
+
+def get_weighted_question(bucket_weights):
+    """Sample a question across (category, difficulty) buckets by weight.
+
+    The bucket is drawn from a cached alias table and the question from that
+    bucket's id pool, so a mixed quiz costs no more than a single-category one.
+    Returns None if none of the buckets has questions.
+    """
+    key = tuple(sorted(bucket_weights.items()))
+    entry = _alias_tables.get(key)
+    if entry is None:
+        pools = get_id_pools()
+        weighted = [(bucket, weight) for bucket, weight in key if weight > 0 and pools.get(bucket)]
+        if not weighted:
+            return None
+        entry = ([bucket for bucket, _ in weighted], AliasTable([weight for _, weight in weighted]))
+        if len(_alias_tables) > 1000:
+            _alias_tables.clear()
+        _alias_tables[key] = entry
+
+    buckets, table = entry
+    pool = get_id_pool(*buckets[table.sample()])
+    if not pool:
+        return None
+    return get_question(random.choice(pool))
+
+
+PRELOAD_CHUNK_SIZE = 1000
+
+
+def preload_questions(deadline=None):
+    """Serialize every active question into the cache, streaming in chunks.
+
+    Stops after the chunk that passes ``deadline`` (a time.perf_counter()
+    value); questions not loaded yet are fetched lazily by get_question().
+    Returns the number of questions loaded.
+    """
+    rows = (
+        Question.objects.filter(is_active=True)
+        .values(*QuestionSerializer.Meta.fields)
+        .iterator(chunk_size=PRELOAD_CHUNK_SIZE)
+    )
+    loaded = 0
+    for row in rows:
+        _questions[row['id']] = row
+        loaded += 1
+        if deadline is not None and loaded % PRELOAD_CHUNK_SIZE == 0 and time.perf_counter() >= deadline:
+            logger.warning('Question preload stopped at the warm-up deadline after %d questions', loaded)
+            break
+    return loaded
+
+
+def warm(budget=None):
+    """Preload id pools, category metadata and serialized questions.
+
+    Stops before the next step once ``budget`` seconds have elapsed, and the
+    question preload itself stops at the deadline, so a worker never spends
+    unbounded time booting (the id pool query is a single small query and is
+    not split). Returns per-step timings.
+    """
+    timings = {}
+    started = time.perf_counter()
+    deadline = started + budget if budget is not None else None
+
+    steps = [
+        ('id_pools', get_id_pools),
+        ('category_metadata', get_category_metadata),
+        ('questions', lambda: preload_questions(deadline)),
+    ]
+    for name, step in steps:
+        if deadline is not None and time.perf_counter() >= deadline:
+            logger.warning('Question cache warm-up budget of %ss exhausted before %s', budget, name)
+            break
+        step_started = time.perf_counter()
+        step()
+        timings[name] = time.perf_counter() - step_started
+
+    return timings
+
+
+def invalidate():
+    """Drop every cached pool, metadata entry, serialized question and alias table"""
+    global _id_pools, _category_metadata
+    with _lock:
+        _id_pools = None
+        _category_metadata = None
+        _questions.clear()
+        _alias_tables.clear()
@@ -0,0 +1,35 @@
+import random
+
+
+class AliasTable:
+    """Walker/Vose alias table: O(n) to build, O(1) per weighted sample"""
+
+    def __init__(self, weights, rng=random):
+        if not weights or any(weight < 0 for weight in weights) or sum(weights) <= 0:
+            raise ValueError('Weights must be non-negative with a positive sum')
+
+        self.rng = rng
+        n = len(weights)
+        total = sum(weights)
+        scaled = [weight * n / total for weight in weights]
+
+        self.probability = [0.0] * n
+        self.alias = [0] * n
+        small = [i for i, p in enumerate(scaled) if p < 1]
+        large = [i for i, p in enumerate(scaled) if p >= 1]
+
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.probability[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] -= 1 - scaled[less]
+            (small if scaled[more] < 1 else large).append(more)
+
+        # Whatever is left is 1 up to rounding error
+        for i in small + large:
+            self.probability[i] = 1.0
+
+    def sample(self):
+        """Return an index drawn in proportion to its weight"""
+        i = self.rng.randrange(len(self.probability))
+        return i if self.rng.random() < self.probability[i] else self.alias[i]
@@ -19,4 +19,30 @@ class UserAnswerSerializer(serializers.ModelSerializer):
 class KidModeSerializer(serializers.ModelSerializer):
     class Meta:
         model = KidMode
-        fields = ['is_enabled', 'max_difficulty', 'time_limit_per_question']
\ No newline at end of file
+        fields = ['is_enabled', 'max_difficulty', 'time_limit_per_question']
+
+class BulkQuestionSerializer(serializers.Serializer):
+    """One row of a bulk upsert.
+
+    A plain Serializer on purpose: ModelSerializer's unique validators would
+    cost a query per row; uniqueness is checked for the whole batch instead.
+    """
+    id = serializers.IntegerField(required=False)
+    api_question_id = serializers.IntegerField(required=False, allow_null=True)
+    question_text = serializers.CharField()
+    category = serializers.CharField(max_length=100)
+    difficulty = serializers.ChoiceField(choices=['easy', 'medium', 'hard'])
+    correct_answer = serializers.CharField(max_length=255)
+    incorrect_answers = serializers.ListField(child=serializers.CharField(max_length=255), min_length=1, max_length=10)
+    is_active = serializers.BooleanField(required=False)  # new rows default to active
+
+class QuestionChangeSerializer(serializers.Serializer):
+    """One row of a bulk recategorize"""
+    id = serializers.IntegerField()
+    category = serializers.CharField(max_length=100, required=False)
+    difficulty = serializers.ChoiceField(choices=['easy', 'medium', 'hard'], required=False)
+
+    def validate(self, data):
+        if 'category' not in data and 'difficulty' not in data:
+            raise serializers.ValidationError('category or difficulty is required')
+        return data
@@ -0,0 +1,31 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from . import http_cache, kid_mode, question_cache
+from .models import KidMode, Question, QuizSession
+
+# Sent once per bulk write batch (bulk_create/bulk_update skip post_save)
+questions_changed = Signal()
+
+
+@receiver(questions_changed)
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def invalidate_question_cache(sender, **kwargs):
+    """Drop this process's question cache whenever a question changes"""
+    question_cache.invalidate()
+    http_cache.bump(http_cache.QUESTION)
+
+
+@receiver(post_save, sender=QuizSession)
+@receiver(post_delete, sender=QuizSession)
+def bump_quiz_session_version(sender, **kwargs):
+    """Invalidate ETags and cached responses derived from quiz sessions"""
+    http_cache.bump(http_cache.QUIZ_SESSION)
+
+
+@receiver(post_save, sender=KidMode)
+@receiver(post_delete, sender=KidMode)
+def invalidate_kid_mode_policy(sender, instance, **kwargs):
+    """Drop the cached kid-mode policy for the affected user"""
+    kid_mode.invalidate(instance.user_id)
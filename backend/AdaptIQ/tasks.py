@@ -0,0 +1,58 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import http_cache
+from .background import task
+from .models import Question, QuestionStats, UserSession
+
+
+@task('question_stats')
+def update_question_stats(payloads):
+    """Roll answer events up into QuestionStats, one UPDATE per question"""
+    totals = defaultdict(lambda: [0, 0])
+    for payload in payloads:
+        totals[payload['question_id']][0] += 1
+        totals[payload['question_id']][1] += 1 if payload['is_correct'] else 0
+
+    # Questions may have been deleted since the answer was given
+    question_ids = set(Question.objects.filter(id__in=totals).values_list('id', flat=True))
+
+    with transaction.atomic():
+        QuestionStats.objects.bulk_create(
+            [QuestionStats(question_id=question_id) for question_id in question_ids],
+            ignore_conflicts=True
+        )
+        now = timezone.now()
+        for question_id in question_ids:
+            answered, correct = totals[question_id]
+            QuestionStats.objects.filter(question_id=question_id).update(
+                times_answered=F('times_answered') + answered,
+                times_correct=F('times_correct') + correct,
+                updated_at=now
+            )
+    http_cache.bump(http_cache.QUESTION_STATS)
+
+
+@task('warning_history')
+def append_warning_history(payloads):
+    """Append deferred warning entries to each UserSession's history"""
+    entries = defaultdict(list)
+    for payload in payloads:
+        entries[payload['user_session_id']].append(payload['warning'])
+
+    with transaction.atomic():
+        for user_session in UserSession.objects.select_for_update().filter(id__in=entries):
+            # Redelivered jobs must not duplicate entries
+            seen = {entry.get('warning_number') for entry in user_session.warning_history}
+            new_entries = []
+            for entry in entries[user_session.id]:
+                if entry['warning_number'] not in seen:
+                    seen.add(entry['warning_number'])
+                    new_entries.append(entry)
+            new_entries.sort(key=lambda entry: entry['warning_number'])
+            if new_entries:
+                user_session.warning_history.extend(new_entries)
+                user_session.save(update_fields=['warning_history'])
@@ -0,0 +1,119 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from AdaptIQ import background, tasks, throttling
+from AdaptIQ.models import UserSession
+
+
+class MemoryQueueTests(SimpleTestCase):
+    def setUp(self):
+        self.queue = background.MemoryQueue(max_attempts=2)
+        self.calls = []
+
+    def test_batches_are_grouped_by_task(self):
+        with mock.patch.dict(background._handlers, {'record': self.calls.append}):
+            self.queue.process([('record', {'n': 1}, 0), ('record', {'n': 2}, 0)])
+        self.assertEqual(self.calls, [[{'n': 1}, {'n': 2}]])
+
+    def test_failed_jobs_are_retried_then_dropped(self):
+        def fail(payloads):
+            self.calls.append(payloads)
+            raise ValueError('boom')
+
+        with mock.patch.dict(background._handlers, {'fail': fail}), \
+                self.assertLogs('AdaptIQ.background', 'ERROR') as logs:
+            self.queue.process([('fail', {'n': 1}, 0)])
+            self.assertEqual(self.queue._queue.qsize(), 1)
+            self.queue.flush()
+
+        self.assertEqual(len(self.calls), 2)
+        self.assertTrue(self.queue._queue.empty())
+        self.assertIn('Giving up on fail job after 2 attempts', logs.output[-1])
+
+
+class SQLiteQueueTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.queue = background.SQLiteQueue(Path(directory.name) / 'tasks.sqlite3', max_attempts=2)
+        self.addCleanup(lambda: self.queue._connect().close())
+        self.calls = []
+
+    def test_claimed_jobs_are_leased_until_acked(self):
+        self.queue.put('record', {'n': 1})
+        jobs = self.queue.claim()
+        self.assertEqual([(name, payload) for name, payload, _, _ in jobs], [('record', {'n': 1})])
+        self.assertEqual(self.queue.claim(), [])
+
+        self.queue.ack([job_id for _, _, job_id, _ in jobs])
+        self.assertEqual(self.queue.counts(), (0, 0))
+
+    def test_unacked_jobs_are_redelivered_after_the_visibility_timeout(self):
+        self.queue.visibility_timeout = 0
+        self.queue.put('record', {'n': 1})
+        first = self.queue.claim()
+        second = self.queue.claim()
+        self.assertEqual(first[0][2], second[0][2])
+        self.assertEqual(second[0][3], 1)  # attempts before this claim
+
+    def test_process_once_acks_successful_batches(self):
+        self.queue.put('record', {'n': 1})
+        self.queue.put('record', {'n': 2})
+        with mock.patch.dict(background._handlers, {'record': self.calls.append}):
+            self.assertEqual(self.queue.process_once(), 2)
+        self.assertEqual(self.calls, [[{'n': 1}, {'n': 2}]])
+        self.assertEqual(self.queue.counts(), (0, 0))
+
+    def test_failed_jobs_back_off_then_go_dead(self):
+        def fail(payloads):
+            raise ValueError('boom')
+
+        self.queue.put('fail', {'n': 1})
+        with mock.patch.dict(background._handlers, {'fail': fail}), \
+                self.assertLogs('AdaptIQ.background', 'ERROR'):
+            self.assertEqual(self.queue.process_once(), 1)
+            # Backed off, so not due yet
+            self.assertEqual(self.queue.process_once(), 0)
+            self.assertEqual(self.queue.counts(), (1, 0))
+
+            self.queue._connect().execute('UPDATE jobs SET available_at = 0')
+            self.assertEqual(self.queue.process_once(), 1)
+        self.assertEqual(self.queue.counts(), (0, 1))
+        self.assertEqual(self.queue.claim(), [])
+
+
+class WarningHistoryTests(TestCase):
+    def setUp(self):
+        throttling._stores.clear()
+        self.user = User.objects.create_user('student')
+        self.user_session = UserSession.objects.create(user=self.user)
+
+    def warning(self, number):
+        return {'user_session_id': self.user_session.id, 'warning': {'type': 'left_frame', 'warning_number': number}}
+
+    def test_redelivered_warnings_are_not_duplicated(self):
+        tasks.append_warning_history([self.warning(2), self.warning(1)])
+        tasks.append_warning_history([self.warning(1), self.warning(2), self.warning(2)])
+
+        self.user_session.refresh_from_db()
+        self.assertEqual([entry['warning_number'] for entry in self.user_session.warning_history], [1, 2])
+
+    def test_report_movement_violation_stops_after_termination(self):
+        client = APIClient()
+        url = '/api/quiz/report-movement-violation/'
+        data = {'user_session_id': self.user_session.id, 'violation_type': 'left_frame'}
+
+        for _ in range(3):
+            response = client.post(url, data, format='json')
+        self.assertTrue(response.data['should_force_quit'])
+
+        response = client.post(url, data, format='json')
+        self.assertTrue(response.data['should_force_quit'])
+        self.assertEqual(response.data['warning_number'], 3)
+        self.user_session.refresh_from_db()
+        self.assertEqual(self.user_session.movement_warnings, 3)
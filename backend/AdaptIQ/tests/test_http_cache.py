@@ -0,0 +1,79 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from AdaptIQ import http_cache, question_cache
+from AdaptIQ.models import Question
+
+
+class ConditionalTests(TestCase):
+    url = '/api/quiz/categories/'
+
+    def setUp(self):
+        cache.clear()
+        question_cache.invalidate()
+        self.client = APIClient()
+
+    def test_matching_etag_returns_304(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_etag_changes_when_the_version_is_bumped(self):
+        etag = self.client.get(self.url)['ETag']
+        http_cache.bump(http_cache.QUESTION)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_saving_a_question_refreshes_categories(self):
+        etag = self.client.get(self.url)['ETag']
+        Question.objects.create(
+            question_text='2 + 2', category='maths', difficulty='easy',
+            correct_answer='4', incorrect_answers=['3'],
+        )
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['categories']['maths']['total'], 1)
+
+
+class CachedViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = []
+
+        @api_view(['GET'])
+        @http_cache.cached_view(http_cache.QUESTION)
+        def view(request):
+            self.calls.append(request.user.username)
+            return Response({'user': request.user.username, 'call': len(self.calls)})
+
+        self.view = view
+        self.factory = APIRequestFactory()
+        self.alice = User.objects.create_user('alice')
+        self.bob = User.objects.create_user('bob')
+
+    def get(self, user):
+        request = self.factory.get('/cached/')
+        force_authenticate(request, user)
+        return self.view(request)
+
+    def test_responses_are_cached_per_user(self):
+        self.assertEqual(self.get(self.alice).data, {'user': 'alice', 'call': 1})
+        self.assertEqual(self.get(self.alice).data, {'user': 'alice', 'call': 1})
+        self.assertEqual(self.get(self.bob).data, {'user': 'bob', 'call': 2})
+        self.assertEqual(self.calls, ['alice', 'bob'])
+
+    def test_version_bump_misses_the_cache(self):
+        self.get(self.alice)
+        http_cache.bump(http_cache.QUESTION)
+        self.assertEqual(self.get(self.alice).data['call'], 2)
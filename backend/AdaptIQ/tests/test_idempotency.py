@@ -0,0 +1,117 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from AdaptIQ import idempotency, question_cache, throttling, views
+from AdaptIQ.models import Question
+
+
+class CoalesceTests(SimpleTestCase):
+    def test_successful_result_is_reused(self):
+        calls = []
+
+        def func():
+            calls.append(1)
+            return {'ok': True}, 200
+
+        self.assertEqual(idempotency.coalesce('tests:success', func), ({'ok': True}, 200))
+        self.assertEqual(idempotency.coalesce('tests:success', func), ({'ok': True}, 200))
+        self.assertEqual(len(calls), 1)
+
+    def test_failure_is_not_stored(self):
+        def fail():
+            raise RuntimeError('boom')
+
+        with self.assertRaises(RuntimeError):
+            idempotency.coalesce('tests:failure', fail)
+        self.assertEqual(idempotency.coalesce('tests:failure', lambda: ({}, 201)), ({}, 201))
+
+    def test_client_errors_are_not_stored(self):
+        idempotency.coalesce('tests:client-error', lambda: ({'error': 'x'}, 400))
+        self.assertEqual(idempotency.coalesce('tests:client-error', lambda: ({}, 200)), ({}, 200))
+
+    def test_waiter_retries_after_the_in_flight_call_fails(self):
+        started, release = threading.Event(), threading.Event()
+        results = {}
+
+        def fail():
+            started.set()
+            release.wait(5)
+            raise RuntimeError('boom')
+
+        def owner():
+            try:
+                idempotency.coalesce('tests:waiter', fail)
+            except RuntimeError:
+                results['owner'] = 'raised'
+
+        owner_thread = threading.Thread(target=owner)
+        owner_thread.start()
+        started.wait(5)
+
+        waiter_thread = threading.Thread(
+            target=lambda: results.update(waiter=idempotency.coalesce('tests:waiter', lambda: ({'retried': True}, 200)))
+        )
+        waiter_thread.start()
+        time.sleep(0.05)  # let the waiter block on the in-flight call
+        release.set()
+        owner_thread.join(5)
+        waiter_thread.join(5)
+
+        self.assertEqual(results, {'owner': 'raised', 'waiter': ({'retried': True}, 200)})
+
+    def test_waiter_gives_up_after_the_timeout(self):
+        started, release = threading.Event(), threading.Event()
+
+        def slow():
+            started.set()
+            release.wait(5)
+            return {}, 200
+
+        thread = threading.Thread(target=idempotency.coalesce, args=('tests:timeout', slow))
+        thread.start()
+        started.wait(5)
+        try:
+            self.assertIsNone(idempotency.coalesce('tests:timeout', slow, timeout=0.01))
+        finally:
+            release.set()
+            thread.join(5)
+
+
+class SubmitAnswerIdempotencyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        throttling._stores.clear()
+        question_cache.invalidate()
+        for i in range(3):
+            Question.objects.create(
+                question_text=f'Question {i}', category='computer', difficulty='medium',
+                correct_answer='a', incorrect_answers=['b', 'c', 'd'],
+            )
+        self.client = APIClient()
+        started = self.client.post('/api/quiz/start-quiz/', {'category': 'computer'}, format='json')
+        self.quiz_session_id = started.data['quiz_session_id']
+        self.question = started.data['question']
+
+    def submit(self, **extra):
+        return self.client.post('/api/quiz/submit-answer/', {
+            'quiz_session_id': self.quiz_session_id,
+            'question_id': self.question['id'],
+            'selected_answer': 'a',
+        }, format='json', **extra)
+
+    def test_retry_with_the_same_key_is_answered_once(self):
+        first = self.submit(HTTP_IDEMPOTENCY_KEY='retry-1')
+        second = self.submit(HTTP_IDEMPOTENCY_KEY='retry-1')
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(views.quiz_sessions[self.quiz_session_id]['total_questions_answered'], 1)
+
+    def test_without_a_key_every_submission_is_scored(self):
+        self.submit()
+        self.submit()
+        self.assertEqual(views.quiz_sessions[self.quiz_session_id]['total_questions_answered'], 2)
@@ -0,0 +1,131 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from AdaptIQ import kid_mode, question_cache, throttling, views
+from AdaptIQ.models import KidMode, Question
+
+EASY_ONLY = {'max_difficulty': 'easy', 'time_limit_per_question': 30}
+
+
+class PolicyTests(SimpleTestCase):
+    def test_allows(self):
+        self.assertTrue(kid_mode.allows(None, 'hard'))
+        self.assertTrue(kid_mode.allows(EASY_ONLY, 'easy'))
+        self.assertFalse(kid_mode.allows(EASY_ONLY, 'medium'))
+
+    def test_cap_difficulty(self):
+        self.assertEqual(kid_mode.cap_difficulty(EASY_ONLY, 'hard'), 'easy')
+        self.assertEqual(kid_mode.cap_difficulty(None, 'hard'), 'hard')
+
+    def test_is_timed_out_allows_the_grace_period(self):
+        with self.settings(ADAPTIQ_KID_MODE_GRACE_SECONDS=2):
+            self.assertFalse(kid_mode.is_timed_out(EASY_ONLY, served_at=100, now=131))
+            self.assertTrue(kid_mode.is_timed_out(EASY_ONLY, served_at=100, now=133))
+            self.assertFalse(kid_mode.is_timed_out(None, served_at=100, now=1000))
+
+
+class PolicyCacheTests(TestCase):
+    def setUp(self):
+        kid_mode._policies.clear()
+        self.user = User.objects.create_user('child')
+
+    def test_policy_is_cached(self):
+        KidMode.objects.create(user=self.user, is_enabled=True, max_difficulty='easy', time_limit_per_question=30)
+        self.assertEqual(kid_mode.get_policy(self.user.id), EASY_ONLY)
+        with self.assertNumQueries(0):
+            self.assertEqual(kid_mode.get_policy(self.user.id), EASY_ONLY)
+
+    def test_users_without_kid_mode_are_cached_too(self):
+        self.assertIsNone(kid_mode.get_policy(self.user.id))
+        with self.assertNumQueries(0):
+            self.assertIsNone(kid_mode.get_policy(self.user.id))
+
+    def test_saving_kid_mode_invalidates_the_cache(self):
+        self.assertIsNone(kid_mode.get_policy(self.user.id))
+        kid_settings = KidMode.objects.create(user=self.user, is_enabled=True, max_difficulty='easy', time_limit_per_question=30)
+        self.assertEqual(kid_mode.get_policy(self.user.id), EASY_ONLY)
+
+        kid_settings.is_enabled = False
+        kid_settings.save()
+        self.assertIsNone(kid_mode.get_policy(self.user.id))
+
+    def test_deleting_kid_mode_invalidates_the_cache(self):
+        kid_settings = KidMode.objects.create(user=self.user, is_enabled=True, max_difficulty='easy', time_limit_per_question=30)
+        kid_mode.get_policy(self.user.id)
+        kid_settings.delete()
+        self.assertIsNone(kid_mode.get_policy(self.user.id))
+
+
+class KidModeQuizTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        kid_mode._policies.clear()
+        question_cache.invalidate()
+        throttling._stores.clear()
+        for difficulty in kid_mode.DIFFICULTY_LEVELS:
+            for i in range(3):
+                Question.objects.create(
+                    question_text=f'{difficulty} {i}', category='computer', difficulty=difficulty,
+                    correct_answer='a', incorrect_answers=['b', 'c', 'd'],
+                )
+        self.user = User.objects.create_user('child')
+        KidMode.objects.create(user=self.user, is_enabled=True, max_difficulty='easy', time_limit_per_question=30)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def start(self, **data):
+        response = self.client.post('/api/quiz/start-quiz/', {'category': 'computer', **data}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def submit(self, quiz_session_id, question, answer='a'):
+        return self.client.post('/api/quiz/submit-answer/', {
+            'quiz_session_id': quiz_session_id,
+            'question_id': question['id'],
+            'selected_answer': answer,
+        }, format='json').data
+
+    def test_difficulty_is_capped(self):
+        started = self.start()
+        self.assertEqual(started['current_difficulty'], 'easy')
+        self.assertEqual(started['time_limit_per_question'], 30)
+
+        question = started['question']
+        for _ in range(4):
+            self.assertEqual(question['difficulty'], 'easy')
+            result = self.submit(started['quiz_session_id'], question)
+            self.assertTrue(result['is_correct'])
+            self.assertEqual(result['current_difficulty'], 'easy')
+            question = result['next_question']
+
+    def test_late_answer_is_scored_incorrect(self):
+        started = self.start()
+        views.quiz_sessions[started['quiz_session_id']]['question_served_at'] = time.time() - 60
+
+        result = self.submit(started['quiz_session_id'], started['question'])
+        self.assertFalse(result['is_correct'])
+        self.assertTrue(result['timed_out'])
+        self.assertEqual(result['points_earned'], 0)
+
+    def test_answer_in_time_is_scored(self):
+        started = self.start()
+        result = self.submit(started['quiz_session_id'], started['question'])
+        self.assertTrue(result['is_correct'])
+        self.assertFalse(result['timed_out'])
+
+    def test_mixed_difficulties_are_capped(self):
+        started = self.start(difficulties={'easy': 1, 'hard': 5})
+        question = started['question']
+        for _ in range(5):
+            self.assertEqual(question['difficulty'], 'easy')
+            question = self.submit(started['quiz_session_id'], question)['next_question']
+
+    def test_users_without_kid_mode_are_not_capped(self):
+        self.client.force_authenticate(User.objects.create_user('adult'))
+        started = self.start()
+        self.assertEqual(started['current_difficulty'], 'medium')
+        self.assertIsNone(started['time_limit_per_question'])
@@ -0,0 +1,137 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core import signing
+from django.db import IntegrityError
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from AdaptIQ import practice_packs
+from AdaptIQ.models import Question, QuizSession, UserAnswer
+
+
+def make_pack(user_id, questions, pack_id='pack-1'):
+    """Build and sign a pack around the given question dicts"""
+    pack = {
+        'pack_id': pack_id,
+        'user_id': user_id,
+        'category': 'computer',
+        'rules': {
+            'start_difficulty': 'medium',
+            'max_difficulty': 'hard',
+            'points': practice_packs.DIFFICULTY_POINTS,
+            'streak_to_change': practice_packs.STREAK_TO_CHANGE,
+            'max_questions': practice_packs.MAX_QUESTIONS,
+        },
+        'questions': questions,
+    }
+    return pack, signing.dumps(pack, salt=practice_packs.PACK_SALT, compress=True)
+
+
+PACK_QUESTIONS = [
+    {'id': 1, 'difficulty': 'easy', 'correct_answer': 'a'},
+    {'id': 2, 'difficulty': 'medium', 'correct_answer': 'a'},
+    {'id': 3, 'difficulty': 'medium', 'correct_answer': 'a'},
+    {'id': 4, 'difficulty': 'hard', 'correct_answer': 'a'},
+]
+
+
+class PracticePackTests(SimpleTestCase):
+    def test_load_pack_round_trip(self):
+        pack, token = make_pack(7, PACK_QUESTIONS)
+        self.assertEqual(practice_packs.load_pack(token, 7), pack)
+
+    def test_tampered_signature_is_rejected(self):
+        _, token = make_pack(7, PACK_QUESTIONS)
+        tampered = token[:-1] + ('A' if token[-1] != 'A' else 'B')
+        with self.assertRaisesMessage(practice_packs.PackError, 'Invalid practice pack signature'):
+            practice_packs.load_pack(tampered, 7)
+
+    def test_pack_of_another_user_is_rejected(self):
+        _, token = make_pack(7, PACK_QUESTIONS)
+        with self.assertRaisesMessage(practice_packs.PackError, 'another user'):
+            practice_packs.load_pack(token, 8)
+
+    def test_replay_follows_adaptive_rules(self):
+        pack, _ = make_pack(7, PACK_QUESTIONS)
+        totals, results = practice_packs.replay(pack, [
+            {'question_id': 2, 'selected_answer': 'a'},
+            {'question_id': 3, 'selected_answer': 'a'},
+            {'question_id': 4, 'selected_answer': 'b'},
+        ])
+        self.assertEqual([result['difficulty_at_time'] for result in results], ['medium', 'medium', 'hard'])
+        self.assertEqual(totals['total_score'], 20)
+        self.assertEqual(totals['current_difficulty'], 'hard')
+
+    def test_out_of_sequence_difficulty_is_rejected(self):
+        pack, _ = make_pack(7, PACK_QUESTIONS)
+        with self.assertRaisesMessage(practice_packs.PackError, 'expected a medium question'):
+            practice_packs.replay(pack, [{'question_id': 4, 'selected_answer': 'a'}])
+
+    def test_repeated_question_is_rejected(self):
+        pack, _ = make_pack(7, PACK_QUESTIONS)
+        with self.assertRaisesMessage(practice_packs.PackError, 'already answered'):
+            practice_packs.replay(pack, [
+                {'question_id': 2, 'selected_answer': 'b'},
+                {'question_id': 2, 'selected_answer': 'b'},
+            ])
+
+
+class PracticePackUploadTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('player', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.questions = [
+            Question.objects.create(
+                question_text=f'Question {difficulty}',
+                category='computer',
+                difficulty=difficulty,
+                correct_answer='a',
+                incorrect_answers=['b', 'c', 'd'],
+            )
+            for difficulty in ('medium', 'medium')
+        ]
+
+    def upload(self, token):
+        return self.client.post('/api/quiz/practice-pack/upload/', {
+            'pack': token,
+            'answers': [{'question_id': question.id, 'selected_answer': 'a'} for question in self.questions],
+        }, format='json')
+
+    def test_repeated_upload_conflicts(self):
+        _, token = make_pack(self.user.id, [
+            {'id': question.id, 'difficulty': question.difficulty, 'correct_answer': 'a'}
+            for question in self.questions
+        ])
+
+        first = self.upload(token)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.data['total_score'], 20)
+
+        second = self.upload(token)
+        self.assertEqual(second.status_code, 409)
+        self.assertEqual(QuizSession.objects.filter(user=self.user).count(), 1)
+
+    def test_answers_to_deleted_questions_are_skipped(self):
+        _, token = make_pack(self.user.id, [
+            {'id': question.id, 'difficulty': question.difficulty, 'correct_answer': 'a'}
+            for question in self.questions
+        ])
+        deleted_id = self.questions[1].id
+        Question.objects.filter(id=deleted_id).delete()
+
+        response = self.upload(token)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['skipped_question_ids'], [deleted_id])
+        self.assertEqual(response.data['total_score'], 20)
+        self.assertEqual(list(UserAnswer.objects.values_list('question_id', flat=True)), [self.questions[0].id])
+
+    def test_other_integrity_errors_are_not_reported_as_duplicates(self):
+        _, token = make_pack(self.user.id, [
+            {'id': question.id, 'difficulty': question.difficulty, 'correct_answer': 'a'}
+            for question in self.questions
+        ])
+        with mock.patch.object(UserAnswer.objects, 'bulk_create', side_effect=IntegrityError('other')):
+            with self.assertRaises(IntegrityError):
+                self.upload(token)
@@ -0,0 +1,282 @@
+import sys
+import time
+import types
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from unittest import mock
+
+import cv2
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from AdaptIQ import face_detection, proctoring, throttling
+from AdaptIQ.models import UserSession
+
+
+def make_jpeg(value=0, noise_seed=None, size=(320, 240)):
+    """Encode a flat (or noisy) grayscale frame as JPEG bytes"""
+    width, height = size
+    if noise_seed is None:
+        image = np.full((height, width), value, dtype=np.uint8)
+    else:
+        image = np.random.default_rng(noise_seed).integers(0, 256, (height, width), dtype=np.uint8)
+    return cv2.imencode('.jpg', image)[1].tobytes()
+
+
+class FaceDetectionTests(SimpleTestCase):
+    def test_check_support(self):
+        face_detection.check_support()
+
+    def test_frame_without_a_face(self):
+        result = face_detection.detect_faces(make_jpeg(128))
+        self.assertEqual(result['faces'], 0)
+        self.assertIn('detect_ms', result)
+
+    def test_undecodable_frame(self):
+        self.assertEqual(face_detection.detect_faces(b'not a jpeg'), {'error': 'undecodable_frame'})
+
+    def test_opencv_without_cascades_is_reported(self):
+        opencv5 = types.SimpleNamespace(__version__='5.0.0')
+        with mock.patch.dict(sys.modules, {'cv2': opencv5}):
+            with self.assertRaisesMessage(RuntimeError, face_detection.SUPPORTED_OPENCV):
+                face_detection.check_support()
+
+
+# add_warning() calls close_old_connections() like any worker thread, which
+# would drop the connection out from under a TestCase transaction
+class FramePipelineTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('student')
+        self.user_session = UserSession.objects.create(user=self.user)
+        self.pipeline = proctoring.FramePipeline(workers=1, queue_size=4, missing_face_frames=3)
+
+    def test_unsupported_opencv_fails_when_the_pipeline_is_built(self):
+        with mock.patch.object(face_detection, 'check_support', side_effect=RuntimeError('no cascades')):
+            with self.assertRaisesMessage(ImproperlyConfigured, 'no cascades'):
+                proctoring.FramePipeline()
+
+    def test_full_queue_drops_frames(self):
+        self.pipeline.queue_size = 0
+        accepted, dropped, skipped = self.pipeline.submit(self.user_session, [make_jpeg(noise_seed=1)], [1.0])
+        self.assertEqual((accepted, dropped, skipped), (0, 1, 0))
+        self.assertEqual(self.pipeline.metrics()['dropped'], 1)
+
+    def test_broken_pool_is_reset_by_the_callback(self):
+        executor = object()
+        self.pipeline._executor = executor
+        self.pipeline._in_flight = 1
+        future = Future()
+        future.set_exception(BrokenProcessPool('worker died'))
+
+        with self.assertLogs('AdaptIQ.proctoring', 'ERROR'):
+            self.pipeline._on_result(self.user_session.id, time.perf_counter(), future, executor)
+
+        self.assertIsNone(self.pipeline._executor)
+        self.assertEqual(self.pipeline.metrics()['failed'], 1)
+        self.assertEqual(self.pipeline.metrics()['in_flight'], 0)
+
+    def test_a_newer_pool_is_not_reset_by_an_old_callback(self):
+        current = object()
+        self.pipeline._executor = current
+        self.pipeline._in_flight = 1
+        future = Future()
+        future.set_exception(BrokenProcessPool('worker died'))
+
+        with self.assertLogs('AdaptIQ.proctoring', 'ERROR'):
+            self.pipeline._on_result(self.user_session.id, time.perf_counter(), future, object())
+        self.assertIs(self.pipeline._executor, current)
+
+    def test_warning_is_queued_after_consecutive_frames_without_a_face(self):
+        with mock.patch.object(self.pipeline, 'queue_warning') as queue_warning:
+            self.pipeline.record_detection(self.user_session.id, 0)
+            self.pipeline.record_detection(self.user_session.id, 0)
+            queue_warning.assert_not_called()
+            self.pipeline.record_detection(self.user_session.id, 0)
+        queue_warning.assert_called_once_with(self.user_session.id, 'left_frame', mock.ANY)
+
+    def test_a_face_resets_the_count(self):
+        with mock.patch.object(self.pipeline, 'queue_warning') as queue_warning:
+            self.pipeline.record_detection(self.user_session.id, 0)
+            self.pipeline.record_detection(self.user_session.id, 0)
+            self.pipeline.record_detection(self.user_session.id, 1)
+            self.pipeline.record_detection(self.user_session.id, 0)
+        queue_warning.assert_not_called()
+
+    def test_add_warning_terminates_and_then_stops_counting(self):
+        for _ in range(4):
+            self.pipeline.add_warning(self.user_session.id, 'left_frame', 'No face')
+
+        self.user_session.refresh_from_db()
+        self.assertEqual(self.user_session.movement_warnings, 3)
+        self.assertTrue(self.user_session.is_cheating_detected)
+
+    def test_add_warning_for_a_missing_session_is_ignored(self):
+        self.pipeline.add_warning(self.user_session.id + 100, 'left_frame', 'No face')
+
+
+@override_settings(ADAPTIQ_PROCTORING_WORKERS=1)
+class FramePipelineWorkerTests(TransactionTestCase):
+    """Frames through the real process pool and warning writer thread"""
+
+    def test_frames_without_a_face_record_a_warning(self):
+        user_session = UserSession.objects.create(
+            user=User.objects.create_user('student'),
+            frame_sample_rate=0,
+            max_detection_interval=0,
+        )
+        pipeline = proctoring.FramePipeline(workers=1, queue_size=8, missing_face_frames=3)
+        try:
+            accepted, dropped, skipped = pipeline.submit(
+                user_session, [make_jpeg(value) for value in (10, 20, 30)], [1.0, 2.0, 3.0]
+            )
+            self.assertEqual((accepted, dropped, skipped), (3, 0, 0))
+
+            deadline = time.monotonic() + 30
+            while time.monotonic() < deadline:
+                user_session.refresh_from_db()
+                if user_session.movement_warnings:
+                    break
+                time.sleep(0.1)
+        finally:
+            if pipeline._executor is not None:
+                pipeline._executor.shutdown()
+
+        self.assertEqual(user_session.movement_warnings, 1)
+        self.assertEqual(pipeline.metrics()['processed'], 3)
+
+
+class AnalyzeFramesTests(TestCase):
+    url = '/api/quiz/analyze-frames/'
+
+    def setUp(self):
+        throttling._stores.clear()
+        proctoring._pipeline = None
+        self.addCleanup(setattr, proctoring, '_pipeline', None)
+        self.user_session = UserSession.objects.create(user=User.objects.create_user('student'))
+        self.client = APIClient()
+
+    def upload(self, count=1, **data):
+        frames = [SimpleUploadedFile(f'{i}.jpg', make_jpeg(noise_seed=i), content_type='image/jpeg') for i in range(count)]
+        return self.client.post(self.url, {'user_session_id': self.user_session.id, 'frames': frames, **data})
+
+    @override_settings(ADAPTIQ_PROCTORING_QUEUE_SIZE=0)
+    def test_backpressure_returns_503_with_retry_after(self):
+        response = self.upload()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.data['dropped'], 1)
+        self.assertEqual(response['Retry-After'], '1')
+
+    def test_unsupported_opencv_returns_503(self):
+        with mock.patch.object(face_detection, 'check_support', side_effect=RuntimeError('no cascades')), \
+                self.assertLogs('AdaptIQ.views', 'ERROR'):
+            response = self.upload()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.data['error'], 'Server-side proctoring is unavailable')
+
+    def test_frames_are_required(self):
+        response = self.client.post(self.url, {'user_session_id': self.user_session.id})
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(ADAPTIQ_PROCTORING_MAX_BATCH=1)
+    def test_batch_size_is_limited(self):
+        self.assertEqual(self.upload(count=2).status_code, 400)
+
+    def test_terminated_session_conflicts(self):
+        UserSession.objects.filter(id=self.user_session.id).update(is_cheating_detected=True)
+        self.assertEqual(self.upload().status_code, 409)
+
+    def test_captured_at_must_match_the_frames(self):
+        self.assertEqual(self.upload(count=2, captured_at=['1.0']).status_code, 400)
+
+
+class MotionGateTests(SimpleTestCase):
+    def setUp(self):
+        self.gate = proctoring.MotionGate(sample_rate=2.0, motion_threshold=6.0, max_interval=5.0)
+        self.dark = make_jpeg(10)
+
+    def analyse(self, frame, timestamp, **kwargs):
+        reason, thumbnail = self.gate.check(frame, timestamp, **kwargs)
+        if reason is None:
+            self.gate.commit(thumbnail, timestamp)
+        return reason
+
+    def test_frames_faster_than_the_sample_rate_are_sampled_out(self):
+        self.assertIsNone(self.analyse(self.dark, 0.0))
+        self.assertEqual(self.analyse(self.dark, 0.1), proctoring.MotionGate.SAMPLED_OUT)
+
+    def test_sampling_can_be_skipped(self):
+        self.analyse(self.dark, 0.0)
+        self.assertIsNone(self.analyse(make_jpeg(200), 0.0, sample=False))
+
+    def test_unchanged_frame_is_still(self):
+        self.analyse(self.dark, 0.0)
+        self.assertEqual(self.analyse(self.dark, 1.0), proctoring.MotionGate.STILL)
+
+    def test_motion_is_analysed(self):
+        self.analyse(self.dark, 0.0)
+        self.assertIsNone(self.analyse(make_jpeg(200), 1.0))
+
+    def test_still_frame_is_analysed_after_max_interval(self):
+        self.analyse(self.dark, 0.0)
+        self.assertEqual(self.analyse(self.dark, 4.0), proctoring.MotionGate.STILL)
+        self.assertIsNone(self.analyse(self.dark, 5.5))
+
+    def test_undecodable_frame(self):
+        self.assertEqual(self.analyse(b'not a jpeg', 0.0), proctoring.MotionGate.UNDECODABLE)
+
+
+class FramePipelineGateTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('student')
+        self.user_session = UserSession.objects.create(user=self.user)
+        # Nothing reaches the process pool: every frame passing the gate is dropped
+        self.pipeline = proctoring.FramePipeline(workers=1, queue_size=0)
+
+    def frames(self, count, offset=0):
+        return [make_jpeg(noise_seed=offset + i) for i in range(count)]
+
+    def test_without_captured_at_only_the_first_frame_is_sampled(self):
+        self.assertEqual(self.pipeline.submit(self.user_session, self.frames(3)), (0, 3, 0))
+        # A second batch arriving straight away: its first frame is sampled out
+        self.assertEqual(self.pipeline.submit(self.user_session, self.frames(3, offset=3)), (0, 2, 1))
+
+    def test_captured_at_samples_every_frame(self):
+        self.assertEqual(self.pipeline.submit(self.user_session, self.frames(3), [0.0, 0.1, 0.2]), (0, 1, 2))
+
+    def test_forget_drops_session_state(self):
+        self.pipeline.get_gate(self.user_session)
+        self.pipeline._missing[self.user_session.id] = 2
+        self.pipeline.forget(self.user_session.id)
+        self.assertEqual((self.pipeline._gates, self.pipeline._missing), ({}, {}))
+
+    def test_idle_sessions_are_purged(self):
+        self.pipeline.idle_ttl = 0
+        self.pipeline.get_gate(self.user_session)
+        self.pipeline._missing[self.user_session.id] = 2
+        other = UserSession.objects.create(user=self.user)
+
+        time.sleep(0.01)
+        self.pipeline.get_gate(other)
+        self.assertEqual(list(self.pipeline._gates), [other.id])
+        self.assertEqual(self.pipeline._missing, {})
+
+    def test_terminated_session_is_forgotten(self):
+        self.pipeline.get_gate(self.user_session)
+        for _ in range(3):
+            self.pipeline.add_warning(self.user_session.id, 'left_frame', 'No face')
+        self.assertNotIn(self.user_session.id, self.pipeline._gates)
+
+    def test_stop_camera_monitoring_forgets_the_session(self):
+        proctoring._pipeline = self.pipeline
+        self.addCleanup(setattr, proctoring, '_pipeline', None)
+        self.pipeline.get_gate(self.user_session)
+
+        response = APIClient().post(
+            '/api/quiz/stop-camera-monitoring/', {'user_session_id': self.user_session.id}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.pipeline._gates, {})
@@ -0,0 +1,117 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from AdaptIQ import question_cache
+from AdaptIQ.models import Question
+from AdaptIQ.signals import questions_changed
+
+
+def question_row(text='What is 2 + 2?', **fields):
+    row = {
+        'question_text': text,
+        'category': 'maths',
+        'difficulty': 'easy',
+        'correct_answer': '4',
+        'incorrect_answers': ['3', '5'],
+    }
+    row.update(fields)
+    return row
+
+
+class QuestionAdminTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        question_cache.invalidate()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('admin', is_staff=True))
+
+        self.signals = []
+        def receiver(sender, **kwargs):
+            self.signals.append(sender)
+        questions_changed.connect(receiver)
+        self.addCleanup(questions_changed.disconnect, receiver)
+
+    def upsert(self, rows):
+        return self.client.post('/api/quiz/questions/bulk-upsert/', {'questions': rows}, format='json')
+
+    def test_staff_only(self):
+        self.client.force_authenticate(User.objects.create_user('student'))
+        self.assertEqual(self.upsert([question_row()]).status_code, 403)
+
+    def test_invalid_rows_are_reported_by_index(self):
+        response = self.upsert([question_row(), 'not a row', question_row(difficulty='expert')])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data['errors']), {1, 2})
+        self.assertIn('difficulty', response.data['errors'][2])
+        self.assertFalse(Question.objects.exists())
+
+    def test_upsert_creates_and_updates_with_one_signal(self):
+        existing = Question.objects.create(**question_row('old', api_question_id=7), is_active=False)
+        self.signals.clear()
+
+        response = self.upsert([
+            question_row('new'),
+            question_row('renamed', api_question_id=7),
+        ])
+        self.assertEqual(response.data, {'created': 1, 'updated': 1})
+        self.assertEqual(len(self.signals), 1)
+
+        existing.refresh_from_db()
+        self.assertEqual(existing.question_text, 'renamed')
+        self.assertFalse(existing.is_active)  # left out of the row, so kept
+        self.assertTrue(Question.objects.get(question_text='new').is_active)
+
+    def test_duplicate_ids_in_a_batch_are_rejected(self):
+        response = self.upsert([question_row(api_question_id=1), question_row(api_question_id=1)])
+        self.assertEqual(set(response.data['errors']), {0, 1})
+        self.assertEqual(self.signals, [])
+
+    def test_api_question_id_of_another_question_is_rejected(self):
+        first = Question.objects.create(**question_row('first', api_question_id=1))
+        second = Question.objects.create(**question_row('second', api_question_id=2))
+
+        response = self.upsert([question_row(id=first.id, api_question_id=2)])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['errors'][0], f'api_question_id 2 belongs to question {second.id}')
+
+    def test_same_question_matched_by_two_rows_is_rejected(self):
+        question = Question.objects.create(**question_row(api_question_id=1))
+
+        response = self.upsert([question_row(id=question.id), question_row(api_question_id=1)])
+        self.assertEqual(set(response.data['errors']), {0, 1})
+
+    def test_unknown_id_is_rejected(self):
+        response = self.upsert([question_row(id=999)])
+        self.assertEqual(response.data['errors'], {0: 'Question 999 does not exist'})
+
+    def test_set_active_sends_one_signal(self):
+        questions = [Question.objects.create(**question_row(str(i))) for i in range(3)]
+        self.signals.clear()
+
+        response = self.client.post('/api/quiz/questions/bulk-set-active/', {
+            'ids': [question.id for question in questions],
+            'is_active': False,
+        }, format='json')
+        self.assertEqual(response.data['updated'], 3)
+        self.assertEqual(len(self.signals), 1)
+        self.assertFalse(Question.objects.filter(is_active=True).exists())
+
+    def test_recategorize(self):
+        question = Question.objects.create(**question_row())
+        self.signals.clear()
+        url = '/api/quiz/questions/bulk-recategorize/'
+
+        response = self.client.post(url, {'changes': [{'id': question.id}]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data['errors']), {0})
+
+        response = self.client.post(url, {'changes': [
+            {'id': question.id, 'difficulty': 'hard'},
+            {'id': 999, 'category': 'science'},
+        ]}, format='json')
+        self.assertEqual(response.data, {'updated': 1, 'missing_ids': [999]})
+        self.assertEqual(len(self.signals), 1)
+        question.refresh_from_db()
+        self.assertEqual(question.difficulty, 'hard')
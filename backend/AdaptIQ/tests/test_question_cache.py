@@ -0,0 +1,98 @@
+import time
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from AdaptIQ import http_cache, question_cache, warmup
+from AdaptIQ.models import Question
+
+
+def make_question(difficulty='easy', category='computer', **fields):
+    return Question.objects.create(
+        question_text=f'{category} {difficulty}',
+        category=category,
+        difficulty=difficulty,
+        correct_answer='a',
+        incorrect_answers=['b', 'c', 'd'],
+        **fields
+    )
+
+
+@override_settings(ADAPTIQ_QUESTION_CACHE_CHECK_INTERVAL=0)
+class QuestionCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        question_cache.invalidate()
+        question_cache._checked_at = 0
+
+    def test_pools_hold_active_questions_only(self):
+        active = make_question()
+        make_question(is_active=False)
+        self.assertEqual(question_cache.get_id_pool('computer', 'easy'), [active.id])
+        self.assertEqual(question_cache.get_category_metadata()['computer']['total'], 1)
+
+    def test_save_invalidates_pools(self):
+        first = make_question()
+        self.assertEqual(question_cache.get_id_pool('computer', 'easy'), [first.id])
+
+        second = make_question()
+        self.assertCountEqual(question_cache.get_id_pool('computer', 'easy'), [first.id, second.id])
+
+    def test_version_bump_from_another_process_reloads(self):
+        first = make_question()
+        question_cache.get_id_pools()
+
+        # bulk_create fires no signal, like a write made by another worker
+        second = Question.objects.bulk_create([Question(
+            question_text='other worker', category='computer', difficulty='easy',
+            correct_answer='a', incorrect_answers=['b'],
+        )])[0]
+        self.assertEqual(question_cache.get_id_pool('computer', 'easy'), [first.id])
+
+        http_cache.bump(http_cache.QUESTION)
+        self.assertCountEqual(question_cache.get_id_pool('computer', 'easy'), [first.id, second.id])
+
+    def test_ttl_reloads_without_a_version_change(self):
+        question_cache.get_id_pools()
+        Question.objects.bulk_create([Question(
+            question_text='late', category='maths', difficulty='hard',
+            correct_answer='a', incorrect_answers=['b'],
+        )])
+
+        with override_settings(ADAPTIQ_QUESTION_CACHE_TTL=0):
+            time.sleep(0.01)
+            self.assertEqual(len(question_cache.get_id_pool('maths', 'hard')), 1)
+
+    def test_get_question_falls_back_to_the_database(self):
+        question = make_question()
+        self.assertEqual(question_cache.get_question(str(question.id))['id'], question.id)
+        self.assertIsNone(question_cache.get_question('not a number'))
+
+
+class WarmTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        question_cache.invalidate()
+
+    def test_warm_preloads_every_step(self):
+        question = make_question()
+        timings = question_cache.warm()
+        self.assertEqual(set(timings), {'id_pools', 'category_metadata', 'questions'})
+        self.assertIn(question.id, question_cache._questions)
+
+    def test_exhausted_budget_skips_steps(self):
+        make_question()
+        self.assertEqual(question_cache.warm(budget=0), {})
+        self.assertIsNone(question_cache._id_pools)
+
+    def test_preload_stops_at_the_deadline(self):
+        Question.objects.bulk_create([
+            Question(question_text=str(i), category='computer', difficulty='easy', correct_answer='a', incorrect_answers=['b'])
+            for i in range(question_cache.PRELOAD_CHUNK_SIZE + 10)
+        ])
+        loaded = question_cache.preload_questions(deadline=time.perf_counter())
+        self.assertEqual(loaded, question_cache.PRELOAD_CHUNK_SIZE)
+
+    @override_settings(ADAPTIQ_WARM_START=False)
+    def test_warm_start_is_opt_in(self):
+        self.assertIsNone(warmup.warm_start_if_enabled())
@@ -0,0 +1,43 @@
+import math
+import random
+from collections import Counter
+
+from django.test import SimpleTestCase
+
+from AdaptIQ.sampling import AliasTable
+from AdaptIQ.views import parse_weights
+
+
+class AliasTableTests(SimpleTestCase):
+    def test_samples_in_proportion_to_weights(self):
+        table = AliasTable([1, 2, 7], rng=random.Random(42))
+        draws = 20000
+        counts = Counter(table.sample() for _ in range(draws))
+        for index, expected in enumerate([0.1, 0.2, 0.7]):
+            self.assertAlmostEqual(counts[index] / draws, expected, delta=0.02)
+
+    def test_zero_weight_is_never_sampled(self):
+        table = AliasTable([0, 3], rng=random.Random(42))
+        self.assertEqual({table.sample() for _ in range(1000)}, {1})
+
+    def test_rejects_weights_without_a_positive_sum(self):
+        with self.assertRaises(ValueError):
+            AliasTable([0, 0])
+
+
+class ParseWeightsTests(SimpleTestCase):
+    def test_list_gets_equal_weights(self):
+        self.assertEqual(parse_weights(['maths', 'science']), {'maths': 1, 'science': 1})
+
+    def test_missing_value_means_no_weighting(self):
+        self.assertIsNone(parse_weights(None))
+        self.assertIsNone(parse_weights(''))
+
+    def test_rejects_invalid_weights(self):
+        for value in ([1, 2], {'maths': math.nan}, {'maths': math.inf}, {'maths': -1}, {'maths': True}, {'maths': 0}, {}):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                parse_weights(value)
+
+    def test_rejects_values_outside_allowed(self):
+        with self.assertRaisesMessage(ValueError, 'Unknown value: expert'):
+            parse_weights({'expert': 1}, allowed={'easy', 'medium', 'hard'})
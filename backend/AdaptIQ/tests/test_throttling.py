@@ -0,0 +1,92 @@
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from AdaptIQ import throttling
+from AdaptIQ.throttling import LocalTokenStore, SlidingWindowRateLimiter, parse_rate
+
+RATE_LIMITS = {'submit_answer': '60/min', 'proctoring': '2/min', 'proctoring_frames': '120/min'}
+
+
+class SlidingWindowRateLimiterTests(SimpleTestCase):
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('30/min'), (30, 60))
+        self.assertEqual(parse_rate('5/s'), (5, 1))
+
+    def test_limit_within_a_window(self):
+        limiter = SlidingWindowRateLimiter(LocalTokenStore(), limit=2, window=60)
+        self.assertEqual(limiter.hit('client', now=120), (True, 0))
+        self.assertEqual(limiter.hit('client', now=130), (True, 0))
+        self.assertEqual(limiter.hit('client', now=140), (False, 40))
+
+    def test_previous_window_is_weighted_by_overlap(self):
+        limiter = SlidingWindowRateLimiter(LocalTokenStore(), limit=2, window=60)
+        limiter.hit('client', now=120)
+        limiter.hit('client', now=121)
+
+        # Halfway into the next window the previous two hits count as one
+        self.assertEqual(limiter.hit('client', now=210), (True, 0))
+        self.assertFalse(limiter.hit('client', now=210)[0])
+
+    def test_budget_resets_after_two_windows(self):
+        limiter = SlidingWindowRateLimiter(LocalTokenStore(), limit=1, window=60)
+        self.assertTrue(limiter.hit('client', now=120)[0])
+        self.assertFalse(limiter.hit('client', now=179)[0])
+        self.assertTrue(limiter.hit('client', now=240)[0])
+
+    def test_identities_are_limited_separately(self):
+        limiter = SlidingWindowRateLimiter(LocalTokenStore(), limit=1, window=60)
+        self.assertTrue(limiter.hit('one', now=120)[0])
+        self.assertTrue(limiter.hit('two', now=120)[0])
+
+
+@override_settings(ADAPTIQ_RATE_LIMITS=RATE_LIMITS)
+class SessionRateThrottleTests(TestCase):
+    url = '/api/quiz/report-movement-violation/'
+
+    def setUp(self):
+        throttling._stores.clear()
+        self.client = APIClient()
+
+    def report(self, **extra):
+        return self.client.post(self.url, {'violation_type': 'looking_away'}, format='json', **extra)
+
+    def test_anonymous_clients_are_limited_by_remote_addr(self):
+        statuses = [self.report(HTTP_X_FORWARDED_FOR=f'10.0.0.{i}').status_code for i in range(3)]
+        self.assertEqual(statuses, [200, 200, 429])
+
+    def test_body_session_ids_do_not_reset_the_budget(self):
+        statuses = [
+            self.client.post(self.url, {'violation_type': 'x', 'quiz_session_id': i}, format='json').status_code
+            for i in range(3)
+        ]
+        self.assertEqual(statuses, [200, 200, 429])
+
+    def test_separate_addresses_get_separate_budgets(self):
+        self.report(REMOTE_ADDR='10.0.0.1')
+        self.report(REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(self.report(REMOTE_ADDR='10.0.0.1').status_code, 429)
+        self.assertEqual(self.report(REMOTE_ADDR='10.0.0.2').status_code, 200)
+
+    def test_forwarded_for_is_trusted_only_with_num_proxies(self):
+        with override_settings(REST_FRAMEWORK={'NUM_PROXIES': 1}):
+            statuses = [self.report(HTTP_X_FORWARDED_FOR=f'10.0.0.{i}').status_code for i in range(3)]
+        self.assertEqual(statuses, [200, 200, 200])
+
+    def test_authenticated_users_are_limited_per_user(self):
+        for name in ('one', 'two'):
+            self.client.force_authenticate(User.objects.create_user(name))
+            statuses = [self.report().status_code for _ in range(3)]
+            self.assertEqual(statuses, [200, 200, 429])
+
+    def test_retry_after_header(self):
+        self.report()
+        self.report()
+        response = self.report()
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+    def test_a_scope_set_to_none_is_not_limited(self):
+        with override_settings(ADAPTIQ_RATE_LIMITS=dict(RATE_LIMITS, proctoring=None)):
+            statuses = [self.report().status_code for _ in range(3)]
+        self.assertEqual(statuses, [200, 200, 200])
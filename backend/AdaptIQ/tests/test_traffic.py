@@ -0,0 +1,101 @@
+import io
+import json
+import tempfile
+from pathlib import Path
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from AdaptIQ import question_cache, throttling
+from AdaptIQ.management.commands.replay_traffic import Command
+from AdaptIQ.middleware import selected_index, served_answers
+from AdaptIQ.models import Question
+
+
+class ServedAnswersTests(SimpleTestCase):
+    def test_start_quiz_response(self):
+        response = {'quiz_session_id': 7, 'question': {'id': 3, 'answers': ['b', 'a']}}
+        self.assertEqual(served_answers({'category': 'computer'}, response), {('7', '3'): ['b', 'a']})
+
+    def test_next_question_uses_the_session_from_the_request(self):
+        response = {'next_question': {'id': 4, 'answers': ['a', 'c']}}
+        self.assertEqual(served_answers({'quiz_session_id': 7}, response), {('7', '4'): ['a', 'c']})
+
+    def test_selected_index(self):
+        served = {('7', '3'): ['b', 'a']}
+        body = {'quiz_session_id': 7, 'question_id': 3, 'selected_answer': 'a'}
+        self.assertEqual(selected_index(body, served), 1)
+        self.assertIsNone(selected_index(dict(body, selected_answer='z'), served))
+        self.assertIsNone(selected_index(dict(body, question_id=4), served))
+
+
+class RemapBodyTests(SimpleTestCase):
+    def test_ids_and_selected_answer_follow_this_run(self):
+        ids = {'quiz_session_id': {7: 70}, 'question_id': {3: 30}}
+        served = {'recorded': {}, 'replayed': {('70', '30'): ['x', 'y', 'z']}}
+        record = {
+            'body': {'quiz_session_id': 7, 'question_id': 3, 'selected_answer': 'b'},
+            'selected_index': 2,
+        }
+        self.assertEqual(
+            Command().remap_body(record, ids, served),
+            {'quiz_session_id': 70, 'question_id': 30, 'selected_answer': 'z'}
+        )
+
+    def test_index_is_derived_for_old_recordings(self):
+        ids = {'quiz_session_id': {}, 'question_id': {}}
+        served = {'recorded': {('7', '3'): ['a', 'b']}, 'replayed': {('7', '3'): ['b', 'a']}}
+        record = {'body': {'quiz_session_id': 7, 'question_id': 3, 'selected_answer': 'b'}}
+        self.assertEqual(Command().remap_body(record, ids, served)['selected_answer'], 'a')
+
+
+class RecordAndReplayTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        question_cache.invalidate()
+        throttling._stores.clear()
+        for number in range(3):
+            Question.objects.create(
+                question_text=f'Question {number}', category='computer', difficulty='medium',
+                correct_answer=f'right {number}', incorrect_answers=['wrong 1', 'wrong 2', 'wrong 3'],
+            )
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.log = Path(directory.name) / 'traffic.jsonl'
+
+    def record(self, answers=2):
+        with override_settings(ADAPTIQ_TRAFFIC_RECORDING=True, ADAPTIQ_TRAFFIC_LOG_PATH=self.log):
+            client = APIClient()
+            response = client.post('/api/quiz/start-quiz/', {'category': 'computer'}, format='json')
+            quiz_session_id, question = response.data['quiz_session_id'], response.data['question']
+            picked = []
+            for _ in range(answers):
+                correct = Question.objects.get(id=question['id']).correct_answer
+                picked.append(question['answers'].index(correct))
+                response = client.post('/api/quiz/submit-answer/', {
+                    'quiz_session_id': quiz_session_id,
+                    'question_id': question['id'],
+                    'selected_answer': correct,
+                }, format='json')
+                question = response.data['next_question']
+        return picked
+
+    def test_submissions_record_the_selected_position(self):
+        picked = self.record()
+        records = [json.loads(line) for line in self.log.read_text().splitlines()]
+        self.assertEqual([record['path'] for record in records], ['/api/quiz/start-quiz/'] + ['/api/quiz/submit-answer/'] * 2)
+        self.assertEqual([record['selected_index'] for record in records[1:]], picked)
+        self.assertTrue(all(record['status'] == 200 for record in records))
+
+    def test_replay_is_not_rate_limited(self):
+        self.record()
+        throttling._stores.clear()
+        out = io.StringIO()
+
+        limits = {'submit_answer': '1/min', 'proctoring': '1/min', 'proctoring_frames': '1/min'}
+        with override_settings(ADAPTIQ_RATE_LIMITS=limits):
+            call_command('replay_traffic', str(self.log), speedup=0, host='testserver', stdout=out)
+        self.assertIn('POST /api/quiz/submit-answer/: n=2', out.getvalue())
+        self.assertNotIn('mismatches', out.getvalue())
@@ -0,0 +1,150 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+# Seconds per rate period, using DRF's "<count>/<period>" notation
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """Turn '30/min' into (30, 60)"""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period[0]]
+
+
+class LocalTokenStore:
+    """In-process counter store (per worker)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}  # key -> (count, expires_at)
+
+    def get(self, key):
+        entry = self._counters.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            return 0
+        return entry[0]
+
+    def incr(self, key, ttl):
+        now = time.monotonic()
+        with self._lock:
+            count, expires_at = self._counters.get(key, (0, 0))
+            if expires_at <= now:
+                count, expires_at = 0, now + ttl
+            self._counters[key] = (count + 1, expires_at)
+            if len(self._counters) > 10000:
+                self._purge(now)
+            return count + 1
+
+    def _purge(self, now):
+        """Drop expired counters so idle clients do not pile up"""
+        for key in [k for k, (_, expires_at) in self._counters.items() if expires_at <= now]:
+            del self._counters[key]
+
+
+class CacheTokenStore:
+    """Counter store on a Django cache, so several workers share one limit"""
+
+    def __init__(self, alias=None):
+        self.cache = caches[alias or getattr(settings, 'ADAPTIQ_RATE_LIMIT_CACHE', 'default')]
+
+    def get(self, key):
+        return self.cache.get(key, 0)
+
+    def incr(self, key, ttl):
+        self.cache.add(key, 0, ttl)
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # Expired between add() and incr()
+            self.cache.set(key, 1, ttl)
+            return 1
+
+
+class SlidingWindowRateLimiter:
+    """Sliding window counter: the previous window is weighted by its overlap"""
+
+    def __init__(self, store, limit, window):
+        self.store = store
+        self.limit = limit
+        self.window = window
+
+    def hit(self, identity, now=None):
+        """Record a request. Returns (allowed, seconds until the next slot)"""
+        now = time.time() if now is None else now
+        index, offset = divmod(now, self.window)
+        index = int(index)
+
+        previous = self.store.get(f'ratelimit:{identity}:{index - 1}')
+        current = self.store.get(f'ratelimit:{identity}:{index}')
+        weight = 1 - offset / self.window
+        if previous * weight + current >= self.limit:
+            return False, self.window - offset
+
+        # Keep each bucket alive long enough to be the "previous" window
+        self.store.incr(f'ratelimit:{identity}:{index}', self.window * 2)
+        return True, 0
+
+
+_stores = {}
+
+
+def get_token_store():
+    """Return the configured token store (one instance per process)"""
+    path = getattr(settings, 'ADAPTIQ_RATE_LIMIT_STORE', 'AdaptIQ.throttling.LocalTokenStore')
+    if path not in _stores:
+        _stores[path] = import_string(path)()
+    return _stores[path]
+
+
+class SessionRateThrottle(BaseThrottle):
+    """Rate limit per authenticated user, or per client address for anonymous requests.
+
+    Session ids from the request body are not used: a client picks them, so
+    rotating them would hand out a fresh budget on every request. The same
+    goes for X-Forwarded-For, so the address is REMOTE_ADDR unless
+    REST_FRAMEWORK['NUM_PROXIES'] says how many proxy hops to trust.
+    """
+    scope = None
+
+    def __init__(self):
+        rate = settings.ADAPTIQ_RATE_LIMITS[self.scope]
+        self.limiter = None  # a rate of None turns the scope off, as in DRF's throttles
+        if rate is not None:
+            limit, window = parse_rate(rate)
+            self.limiter = SlidingWindowRateLimiter(get_token_store(), limit, window)
+        self.retry_after = None
+
+    def get_identity(self, request):
+        if request.user and request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        if api_settings.NUM_PROXIES is not None:
+            return f'addr:{self.get_ident(request)}'
+        return f'addr:{request.META.get("REMOTE_ADDR")}'
+
+    def allow_request(self, request, view):
+        if self.limiter is None:
+            return True
+        identity = f'{self.scope}:{self.get_identity(request)}'
+        allowed, self.retry_after = self.limiter.hit(identity)
+        return allowed
+
+    def wait(self):
+        return self.retry_after
+
+
+class SubmitAnswerThrottle(SessionRateThrottle):
+    scope = 'submit_answer'
+
+
+class ProctoringThrottle(SessionRateThrottle):
+    scope = 'proctoring'
+
+
+class FrameUploadThrottle(SessionRateThrottle):
+    scope = 'proctoring_frames'
@@ -5,9 +5,21 @@ urlpatterns = [
     path('start-quiz/', views.start_quiz, name='start_quiz'),
     path('submit-answer/', views.submit_answer, name='submit_answer'),
     path('quiz-stats/', views.get_quiz_stats, name='quiz_stats'),
+    path('categories/', views.get_categories, name='categories'),
     
     # OpenCV endpoints
     path('start-camera-monitoring/', views.start_camera_monitoring, name='start_camera_monitoring'),
     path('stop-camera-monitoring/', views.stop_camera_monitoring, name='stop_camera_monitoring'),
     path('report-movement-violation/', views.report_movement_violation, name='report_movement_violation'),
+    path('analyze-frames/', views.analyze_frames, name='analyze_frames'),
+    path('proctoring-metrics/', views.get_proctoring_metrics, name='proctoring_metrics'),
+    
+    # Offline practice packs
+    path('practice-pack/', views.create_practice_pack, name='create_practice_pack'),
+    path('practice-pack/upload/', views.upload_practice_pack, name='upload_practice_pack'),
+    
+    # Bulk question administration (staff only)
+    path('questions/bulk-upsert/', views.bulk_upsert_questions, name='bulk_upsert_questions'),
+    path('questions/bulk-set-active/', views.bulk_set_questions_active, name='bulk_set_questions_active'),
+    path('questions/bulk-recategorize/', views.bulk_recategorize_questions, name='bulk_recategorize_questions'),
 ]
\ No newline at end of file
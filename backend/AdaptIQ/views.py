@@ -1,11 +1,24 @@
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
-from .models import Question, QuizSession, UserAnswer, KidMode
-from .serializers import QuestionSerializer, QuizSessionSerializer, UserAnswerSerializer, KidModeSerializer
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, transaction
+from .models import Question, QuizSession, UserAnswer, UserSession, KidMode
+from .serializers import (
+    QuestionSerializer, QuizSessionSerializer, UserAnswerSerializer, KidModeSerializer,
+    BulkQuestionSerializer, QuestionChangeSerializer
+)
+from . import background, http_cache, idempotency, kid_mode, practice_packs, proctoring, question_admin, question_cache
+from .throttling import FrameUploadThrottle, ProctoringThrottle, SubmitAnswerThrottle
+import logging
+import math
 import random
+import time
+
+logger = logging.getLogger(__name__)
 
 # Global storage for testing (in production, use database)
 quiz_sessions = {}
@@ -16,11 +29,34 @@ def start_quiz(request):
     """Start a new quiz session"""
     category = request.data.get('category')
     
-    if not category:
+    # Mixed mode: weighted categories and/or difficulties, e.g.
+    # {"categories": {"computer": 2, "maths": 1}, "difficulties": {"easy": 1, "hard": 1}}
+    try:
+        category_weights = parse_weights(request.data.get('categories'))
+        difficulty_weights = parse_weights(request.data.get('difficulties'), allowed=kid_mode.DIFFICULTY_LEVELS)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if not category and not category_weights:
         return Response({'error': 'Category is required'}, status=status.HTTP_400_BAD_REQUEST)
+    if category_weights and not category:
+        category = 'mixed'
     
-    # Get a random medium difficulty question to start
-    question = get_random_question(category, 'medium')
+    # Kid mode caps the difficulty and limits the time per question
+    user_id = request.user.id if request.user.is_authenticated else None
+    policy = kid_mode.get_policy(user_id)
+    start_difficulty = kid_mode.cap_difficulty(policy, 'medium')
+    
+    session = {
+        'user_id': user_id,
+        'category': category,
+        'category_weights': category_weights,
+        'difficulty_weights': difficulty_weights,
+        'current_difficulty': start_difficulty,
+    }
+    
+    # Get a random question at the starting difficulty (medium unless capped)
+    question = pick_question(session, policy)
     
     if not question:
         return Response({'error': 'No questions available for this category'}, status=status.HTTP_404_NOT_FOUND)
@@ -29,75 +65,89 @@ def start_quiz(request):
     session_id = random.randint(1000, 9999)
     
     # Initialize session state for AI tracking
-    quiz_sessions[session_id] = {
-        'category': category,
-        'current_difficulty': 'medium',
+    session.update({
         'consecutive_correct': 0,
         'consecutive_incorrect': 0,
         'total_score': 0,
         'total_questions_answered': 0,
-        'max_questions': 10  # Set limit to 10 questions for testing
-    }
-    
-    # Prepare answers (shuffle them)
-    all_answers = [question.correct_answer] + question.incorrect_answers
-    random.shuffle(all_answers)
+        'max_questions': 10,  # Set limit to 10 questions for testing
+        'question_served_at': time.time()
+    })
+    quiz_sessions[session_id] = session
     
     return Response({
         'quiz_session_id': session_id,
-        'question': {
-            'id': question.id,
-            'question_text': question.question_text,
-            'category': question.category,
-            'difficulty': question.difficulty,
-            'answers': all_answers
-        },
-        'current_difficulty': 'medium'
+        'question': present_question(question),
+        'current_difficulty': start_difficulty,
+        'time_limit_per_question': policy['time_limit_per_question'] if policy else None
     })
 
 @api_view(['POST'])
 # @permission_classes([IsAuthenticated])  # Commented out for testing
+@throttle_classes([SubmitAnswerThrottle])
 def submit_answer(request):
     """Submit an answer and get next question using proper AI logic"""
-    quiz_session_id = request.data.get('quiz_session_id')
-    question_id = request.data.get('question_id')
-    selected_answer = request.data.get('selected_answer')
+    # Retries carrying the same Idempotency-Key are answered once, not re-scored
+    idempotency_key = request.headers.get('Idempotency-Key') or request.data.get('idempotency_key')
+    if not idempotency_key:
+        data, status_code = process_answer(request.data)
+        return Response(data, status=status_code)
+    
+    key = f"{request.data.get('quiz_session_id')}:{idempotency_key}"
+    result = idempotency.coalesce(key, lambda: process_answer(request.data))
+    if result is None:
+        return Response({'error': 'A request with this idempotency key is still in progress'}, status=status.HTTP_409_CONFLICT)
+    
+    data, status_code = result
+    return Response(data, status=status_code)
+
+def process_answer(data):
+    """Score an answer and pick the next question. Returns (response data, status)"""
+    quiz_session_id = data.get('quiz_session_id')
+    question_id = data.get('question_id')
+    selected_answer = data.get('selected_answer')
     
     # Get the question
-    try:
-        question = Question.objects.get(id=question_id)
-    except Question.DoesNotExist:
-        return Response({'error': 'Question not found'}, status=status.HTTP_404_NOT_FOUND)
+    question = question_cache.get_question(question_id)
+    if question is None:
+        return {'error': 'Question not found'}, status.HTTP_404_NOT_FOUND
     
     # Check if answer is correct
-    is_correct = selected_answer == question.correct_answer
+    is_correct = selected_answer == question['correct_answer']
     
     # Get session state
     if quiz_session_id not in quiz_sessions:
-        return Response({'error': 'Invalid session ID'}, status=status.HTTP_400_BAD_REQUEST)
+        return {'error': 'Invalid session ID'}, status.HTTP_400_BAD_REQUEST
     
     session = quiz_sessions[quiz_session_id]
     session['total_questions_answered'] += 1
     
+    # Kid mode: answers after the time limit count as incorrect
+    policy = kid_mode.get_policy(session.get('user_id'))
+    timed_out = kid_mode.is_timed_out(policy, session.get('question_served_at'))
+    if timed_out:
+        is_correct = False
+    
     # Apply AI logic
     if is_correct:
         session['consecutive_correct'] += 1
         session['consecutive_incorrect'] = 0
         
-        # Calculate points based on current difficulty
+        # Calculate points based on current difficulty (the question's own in mixed-difficulty mode)
         difficulty_points = {'easy': 5, 'medium': 10, 'hard': 20}
-        points_earned = difficulty_points.get(session['current_difficulty'], 10)
+        scored_difficulty = question['difficulty'] if session.get('difficulty_weights') else session['current_difficulty']
+        points_earned = difficulty_points.get(scored_difficulty, 10)
         session['total_score'] += points_earned
         
         # Rule: If 2 consecutive correct, increase difficulty
         if session['consecutive_correct'] >= 2:
-            if session['current_difficulty'] == 'easy':
+            if session['current_difficulty'] == 'easy' and kid_mode.allows(policy, 'medium'):
                 session['current_difficulty'] = 'medium'
                 session['consecutive_correct'] = 0  # Reset counter after difficulty change
-            elif session['current_difficulty'] == 'medium':
+            elif session['current_difficulty'] == 'medium' and kid_mode.allows(policy, 'hard'):
                 session['current_difficulty'] = 'hard'
                 session['consecutive_correct'] = 0  # Reset counter after difficulty change
-            # If already 'hard', stay 'hard' (no further increase)
+            # If already 'hard' (or at the kid mode cap), stay there (no further increase)
     else:
         session['consecutive_incorrect'] += 1
         session['consecutive_correct'] = 0
@@ -113,41 +163,40 @@ def submit_answer(request):
                 session['consecutive_incorrect'] = 0  # Reset counter after difficulty change
             # If already 'easy', stay 'easy' (no further decrease)
     
+    # Analytics roll-up happens in the background
+    background.enqueue('question_stats', {'question_id': question['id'], 'is_correct': is_correct})
+    
     # Check if quiz is complete (reached max questions)
     if session['total_questions_answered'] >= session['max_questions']:
         next_question_data = None
     else:
         # Get next question based on new difficulty
-        next_question = get_random_question(question.category, session['current_difficulty'])
+        session['current_difficulty'] = kid_mode.cap_difficulty(policy, session['current_difficulty'])
+        next_question = pick_question(session, policy)
         
         if next_question:
-            # Prepare answers for next question
-            all_answers = [next_question.correct_answer] + next_question.incorrect_answers
-            random.shuffle(all_answers)
-            
-            next_question_data = {
-                'id': next_question.id,
-                'question_text': next_question.question_text,
-                'category': next_question.category,
-                'difficulty': next_question.difficulty,
-                'answers': all_answers
-            }
+            next_question_data = present_question(next_question)
+            session['question_served_at'] = time.time()
         else:
             next_question_data = None
     
-    return Response({
+    return {
         'is_correct': is_correct,
-        'correct_answer': question.correct_answer,
+        'timed_out': timed_out,
+        'correct_answer': question['correct_answer'],
         'points_earned': points_earned,
         'current_difficulty': session['current_difficulty'],
         'total_score': session['total_score'],
         'questions_answered': session['total_questions_answered'],
         'max_questions': session['max_questions'],
+        'time_limit_per_question': policy['time_limit_per_question'] if policy else None,
         'next_question': next_question_data
-    })
+    }, status.HTTP_200_OK
 
+@http_cache.conditional(http_cache.QUIZ_SESSION, http_cache.QUESTION_STATS)
 @api_view(['GET'])
 # @permission_classes([IsAuthenticated])  # Commented out for testing
+@http_cache.cached_view(http_cache.QUIZ_SESSION, http_cache.QUESTION_STATS)
 def get_quiz_stats(request):
     """Get user's quiz statistics"""
     # For testing, return mock stats
@@ -161,24 +210,65 @@ def get_quiz_stats(request):
     
     return Response(stats)
 
+@http_cache.conditional(http_cache.QUESTION)
+@api_view(['GET'])
+@http_cache.cached_view(http_cache.QUESTION)
+def get_categories(request):
+    """Question counts per category and difficulty"""
+    return Response({'categories': question_cache.get_category_metadata()})
+
 @api_view(['POST'])
 # @permission_classes([IsAuthenticated])  # Commented out for testing
+@throttle_classes([ProctoringThrottle])
 def report_movement_violation(request):
     """Report movement violation from OpenCV analysis"""
     violation_type = request.data.get('violation_type')
     reason = request.data.get('reason', '')
-    quiz_session_id = request.data.get('quiz_session_id')
+    user_session_id = request.data.get('user_session_id')
+    
+    if user_session_id is None:
+        # Clients without a UserSession only get a mock acknowledgement
+        return Response({
+            'warning_number': 1,
+            'max_warnings': 2,
+            'should_force_quit': False,
+            'message': f'Warning recorded: {violation_type} - {reason}'
+        })
+    
+    if not violation_type:
+        return Response({'error': 'violation_type is required'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        user_session_id = int(user_session_id)
+    except (TypeError, ValueError):
+        return Response({'error': 'Invalid user_session_id'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Only the warning count is written here; the history entry is queued
+    with transaction.atomic():
+        user_session = get_object_or_404(UserSession.objects.select_for_update(), id=user_session_id)
+        if user_session.is_cheating_detected:
+            # Already terminated: stop counting, like the frame pipeline does
+            return Response({
+                'warning_number': user_session.movement_warnings,
+                'max_warnings': user_session.max_warnings,
+                'should_force_quit': True,
+                'message': 'Session already terminated'
+            })
+        should_force_quit = user_session.add_warning(violation_type, reason, defer_history=True)
+        background.enqueue('warning_history', {
+            'user_session_id': user_session.id,
+            'warning': user_session.last_warning
+        })
     
-    # For testing, return a mock response
     return Response({
-        'warning_number': 1,
-        'max_warnings': 2,
-        'should_force_quit': False,
+        'warning_number': user_session.movement_warnings,
+        'max_warnings': user_session.max_warnings,
+        'should_force_quit': should_force_quit,
         'message': f'Warning recorded: {violation_type} - {reason}'
     })
 
 @api_view(['POST'])
 # @permission_classes([IsAuthenticated])  # Commented out for testing
+@throttle_classes([ProctoringThrottle])
 def start_camera_monitoring(request):
     """Start camera monitoring for a quiz session"""
     quiz_session_id = request.data.get('quiz_session_id')
@@ -191,24 +281,314 @@ def start_camera_monitoring(request):
 
 @api_view(['POST'])
 # @permission_classes([IsAuthenticated])  # Commented out for testing
+@throttle_classes([ProctoringThrottle])
 def stop_camera_monitoring(request):
     """Stop camera monitoring"""
     quiz_session_id = request.data.get('quiz_session_id')
     
+    # Drop the frame pipeline's per-session state for this user session
+    try:
+        proctoring.forget_session(int(request.data.get('user_session_id')))
+    except (TypeError, ValueError):
+        pass
+    
     return Response({
         'status': 'monitoring_stopped',
         'total_warnings': 0,
         'message': 'Camera monitoring stopped'
     })
 
+@api_view(['POST'])
+# @permission_classes([IsAuthenticated])  # Commented out for testing
+@throttle_classes([FrameUploadThrottle])
+def analyze_frames(request):
+    """Queue uploaded JPEG camera frames for server-side face detection"""
+    try:
+        user_session_id = int(request.data.get('user_session_id'))
+    except (TypeError, ValueError):
+        return Response({'error': 'user_session_id is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    user_session = get_object_or_404(UserSession, id=user_session_id)
+    
+    frames = request.FILES.getlist('frames')
+    if not frames:
+        return Response({'error': 'At least one frame is required'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(frames) > settings.ADAPTIQ_PROCTORING_MAX_BATCH:
+        return Response({'error': f'At most {settings.ADAPTIQ_PROCTORING_MAX_BATCH} frames per request'}, status=status.HTTP_400_BAD_REQUEST)
+    if any(frame.size > settings.ADAPTIQ_PROCTORING_MAX_FRAME_BYTES for frame in frames):
+        return Response({'error': 'Frame too large'}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+    
+    if user_session.is_cheating_detected:
+        return Response({
+            'status': 'terminated',
+            'reason': 'cheating_detected',
+            'should_force_quit': True
+        }, status=status.HTTP_409_CONFLICT)
+    
+    # Optional capture times (seconds), one per frame, used for frame sampling
+    timestamps = None
+    if hasattr(request.data, 'getlist'):
+        captured_at = request.data.getlist('captured_at')
+        if captured_at:
+            try:
+                timestamps = [float(value) for value in captured_at]
+            except ValueError:
+                return Response({'error': 'captured_at must be numeric'}, status=status.HTTP_400_BAD_REQUEST)
+            if len(timestamps) != len(frames):
+                return Response({'error': 'captured_at must have one value per frame'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        pipeline = proctoring.get_pipeline()
+    except ImproperlyConfigured as e:
+        logger.error('%s', e)
+        return Response({'error': 'Server-side proctoring is unavailable'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    
+    accepted, dropped, skipped = pipeline.submit(
+        user_session, [frame.read() for frame in frames], timestamps
+    )
+    
+    response = Response({
+        'accepted': accepted,
+        'dropped': dropped,
+        'skipped': skipped,
+        'warning_number': user_session.movement_warnings,
+        'max_warnings': user_session.max_warnings,
+        'should_force_quit': False
+    }, status=status.HTTP_503_SERVICE_UNAVAILABLE if dropped and not accepted else status.HTTP_202_ACCEPTED)
+    
+    # Backpressure: frames were dropped and none got through, ask the client to slow down
+    if dropped and not accepted:
+        response['Retry-After'] = '1'
+    return response
+
+@api_view(['GET'])
+# @permission_classes([IsAuthenticated])  # Commented out for testing
+def get_proctoring_metrics(request):
+    """Frame pipeline queue and latency metrics"""
+    try:
+        return Response(proctoring.get_pipeline().metrics())
+    except ImproperlyConfigured as e:
+        return Response({'error': str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def bulk_upsert_questions(request):
+    """Create or update many questions; rows match on id, then api_question_id"""
+    rows = request.data.get('questions')
+    error = check_batch(rows)
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Validate every row before writing any of them
+    serializer = BulkQuestionSerializer(data=rows, many=True)
+    if not serializer.is_valid():
+        return Response({'errors': row_errors(serializer.errors)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    to_create, to_update, errors = question_admin.plan_upsert(serializer.validated_data)
+    if errors:
+        return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+    
+    created, updated = question_admin.apply_upsert(to_create, to_update)
+    return Response({'created': created, 'updated': updated})
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def bulk_set_questions_active(request):
+    """Deactivate (or reactivate) many questions by id"""
+    question_ids = request.data.get('ids')
+    error = check_batch(question_ids)
+    if not error and not all(isinstance(question_id, int) and not isinstance(question_id, bool) for question_id in question_ids):
+        error = 'ids must be integers'
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+    
+    is_active = request.data.get('is_active', False)
+    if not isinstance(is_active, bool):
+        return Response({'error': 'is_active must be true or false'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    changed = question_admin.set_active(question_ids, is_active)
+    return Response({'updated': changed, 'is_active': is_active})
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def bulk_recategorize_questions(request):
+    """Change the category and/or difficulty of many questions"""
+    changes = request.data.get('changes')
+    error = check_batch(changes)
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+    
+    serializer = QuestionChangeSerializer(data=changes, many=True)
+    if not serializer.is_valid():
+        return Response({'errors': row_errors(serializer.errors)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    changed, missing = question_admin.recategorize(serializer.validated_data)
+    return Response({'updated': changed, 'missing_ids': missing})
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def create_practice_pack(request):
+    """Build a signed, compressed practice pack the app can play offline"""
+    category = request.data.get('category')
+    if not category:
+        return Response({'error': 'Category is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        per_difficulty = int(request.data.get('per_difficulty', 10))
+    except (TypeError, ValueError):
+        return Response({'error': 'per_difficulty must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+    per_difficulty = max(1, min(per_difficulty, settings.ADAPTIQ_PRACTICE_PACK_MAX_PER_DIFFICULTY))
+    
+    policy = kid_mode.get_policy(request.user.id)
+    pack, token = practice_packs.build_pack(request.user.id, category, per_difficulty, policy)
+    if not pack['questions']:
+        return Response({'error': 'No questions available for this category'}, status=status.HTTP_404_NOT_FOUND)
+    
+    return Response({
+        'pack_id': pack['pack_id'],
+        'pack': token,
+        'question_count': len(pack['questions']),
+        'expires_in': settings.ADAPTIQ_PRACTICE_PACK_MAX_AGE
+    })
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def upload_practice_pack(request):
+    """Ingest the answers played offline from a practice pack in one request"""
+    answers = request.data.get('answers')
+    if not isinstance(answers, list) or not answers:
+        return Response({'error': 'answers must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        pack = practice_packs.load_pack(request.data.get('pack', ''), request.user.id)
+        totals, results = practice_packs.replay(pack, answers)
+    except practice_packs.PackError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if QuizSession.objects.filter(practice_pack_id=pack['pack_id']).exists():
+        return Response({'error': 'This practice pack has already been uploaded'}, status=status.HTTP_409_CONFLICT)
+    
+    # Questions deleted since the pack was built still count towards the
+    # score, but their answers cannot be stored
+    existing_ids = set(Question.objects.filter(
+        id__in=[result['question_id'] for result in results]
+    ).values_list('id', flat=True))
+    stored = [result for result in results if result['question_id'] in existing_ids]
+    skipped_ids = sorted({result['question_id'] for result in results} - existing_ids)
+    
+    try:
+        with transaction.atomic():
+            # practice_pack_id is unique, so a concurrent upload of the same pack fails here
+            quiz_session = QuizSession.objects.create(
+                user=request.user,
+                category=pack['category'],
+                is_active=False,
+                practice_pack_id=pack['pack_id'],
+                **totals
+            )
+            UserAnswer.objects.bulk_create([
+                UserAnswer(user=request.user, quiz_session=quiz_session, **result)
+                for result in stored
+            ])
+            for result in stored:
+                background.enqueue('question_stats', {
+                    'question_id': result['question_id'],
+                    'is_correct': result['is_correct']
+                })
+    except IntegrityError:
+        if QuizSession.objects.filter(practice_pack_id=pack['pack_id']).exists():
+            return Response({'error': 'This practice pack has already been uploaded'}, status=status.HTTP_409_CONFLICT)
+        raise
+    
+    return Response({
+        'quiz_session_id': quiz_session.id,
+        'questions_answered': totals['total_questions_answered'],
+        'correct_answers': sum(1 for result in results if result['is_correct']),
+        'total_score': totals['total_score'],
+        'current_difficulty': totals['current_difficulty'],
+        'skipped_question_ids': skipped_ids
+    })
+
+def check_batch(rows):
+    """Return an error message if a bulk payload is not a usable list"""
+    if not isinstance(rows, list) or not rows:
+        return 'A non-empty list is required'
+    if len(rows) > settings.ADAPTIQ_BULK_MAX_ROWS:
+        return f'At most {settings.ADAPTIQ_BULK_MAX_ROWS} rows per request'
+    return None
+
+def row_errors(errors):
+    """Map row index -> errors for a failed many=True serializer
+
+    DRF returns a list with one entry per row, or a dict of only the failing
+    rows keyed by index, depending on the version and the failure.
+    """
+    items = errors.items() if isinstance(errors, dict) else enumerate(errors)
+    return {index: row for index, row in items if row}
+
 def get_random_question(category, difficulty):
     """Get a random question for given category and difficulty"""
-    questions = Question.objects.filter(
-        category=category,
-        difficulty=difficulty,
-        is_active=True
-    )
+    pool = question_cache.get_id_pool(category, difficulty)
+    
+    if pool:
+        return question_cache.get_question(random.choice(pool))
+    return None
+
+def pick_question(session, policy=None):
+    """Next question for a session: one category, or weighted across a mix"""
+    category_weights = session.get('category_weights')
+    difficulty_weights = session.get('difficulty_weights')
+    if not category_weights and not difficulty_weights:
+        return get_random_question(session['category'], session['current_difficulty'])
+    
+    category_weights = category_weights or {session['category']: 1}
+    difficulty_weights = {
+        difficulty: weight for difficulty, weight in (difficulty_weights or {session['current_difficulty']: 1}).items()
+        if kid_mode.allows(policy, difficulty)
+    } or {kid_mode.cap_difficulty(policy, session['current_difficulty']): 1}
+    
+    return question_cache.get_weighted_question({
+        (category, difficulty): category_weight * difficulty_weight
+        for category, category_weight in category_weights.items()
+        for difficulty, difficulty_weight in difficulty_weights.items()
+    })
+
+def parse_weights(value, allowed=None):
+    """Parse {"name": weight} or ["name", ...] (equal weights) into a dict, or None"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, list):
+        if not all(isinstance(name, str) for name in value):
+            raise ValueError('Weight names must be strings')
+        value = {name: 1 for name in value}
+    if not isinstance(value, dict) or not value or len(value) > 50:
+        raise ValueError('Weights must be a non-empty object of name: weight or a list of names')
+    
+    weights = {}
+    for name, weight in value.items():
+        if not isinstance(name, str):
+            raise ValueError('Weight names must be strings')
+        if allowed is not None and name not in allowed:
+            raise ValueError(f'Unknown value: {name}')
+        if (
+            isinstance(weight, bool) or not isinstance(weight, (int, float))
+            or not math.isfinite(weight) or weight < 0
+        ):
+            raise ValueError(f'Weight for {name} must be a finite, non-negative number')
+        weights[name] = weight
+    if not any(weights.values()):
+        raise ValueError('At least one weight must be positive')
+    return weights
+
+def present_question(question):
+    """Build the client payload for a serialized question, with shuffled answers"""
+    all_answers = [question['correct_answer']] + list(question['incorrect_answers'])
+    random.shuffle(all_answers)
     
-    if questions.exists():
-        return random.choice(questions)
-    return None 
\ No newline at end of file
+    return {
+        'id': question['id'],
+        'question_text': question['question_text'],
+        'category': question['category'],
+        'difficulty': question['difficulty'],
+        'answers': all_answers
+    } 
\ No newline at end of file
@@ -0,0 +1,57 @@
+import logging
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.db import DatabaseError
+
+from . import question_cache
+
+logger = logging.getLogger(__name__)
+
+# Modules Django would otherwise import on the first request
+PRELOAD_MODULES = [
+    'rest_framework.decorators',
+    'rest_framework.parsers',
+    'rest_framework.renderers',
+    'rest_framework.negotiation',
+    'AdaptIQ.serializers',
+    'AdaptIQ.views',
+    'AdaptIQ.urls',
+]
+
+
+def warm_start_if_enabled():
+    """Run warm_start when ADAPTIQ_WARM_START is set.
+
+    Called from the WSGI/ASGI entry points once the app registry is ready, so
+    serving workers start warm while management commands never touch the
+    database at import time.
+    """
+    if getattr(settings, 'ADAPTIQ_WARM_START', False):
+        return warm_start(budget=getattr(settings, 'ADAPTIQ_WARM_START_BUDGET', None))
+    return None
+
+
+def warm_start(budget=None):
+    """Import request-path modules and preload the question cache"""
+    timings = {}
+
+    started = time.perf_counter()
+    for module in PRELOAD_MODULES:
+        import_module(module)
+    timings['imports'] = time.perf_counter() - started
+
+    remaining = None
+    if budget is not None:
+        remaining = max(budget - timings['imports'], 0)
+
+    try:
+        timings.update(question_cache.warm(budget=remaining))
+    except DatabaseError as e:
+        # Tables may not exist yet (e.g. before the first migrate)
+        logger.warning('Skipping question cache warm-up: %s', e)
+
+    timings['total'] = time.perf_counter() - started
+    logger.info('AdaptIQ warm start finished in %.3fs', timings['total'])
+    return timings
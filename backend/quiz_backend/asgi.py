@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'quiz_backend.settings')
 
 application = get_asgi_application()
+
+# Opt-in (ADAPTIQ_WARM_START): preload caches before the first request
+from AdaptIQ.warmup import warm_start_if_enabled  # noqa: E402
+
+warm_start_if_enabled()
@@ -51,6 +51,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'AdaptIQ.middleware.TrafficRecorderMiddleware',  # no-op unless ADAPTIQ_TRAFFIC_RECORDING
 ]
 
 ROOT_URLCONF = 'quiz_backend.urls'
@@ -131,4 +132,73 @@ STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
    # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True  # For development only
-CORS_ALLOW_CREDENTIALS = True
\ No newline at end of file
+CORS_ALLOW_CREDENTIALS = True
+
+# Cache shared by every worker. AdaptIQ keeps its version counters (ETags and
+# question cache freshness) and rate limit counters here, so with more than one
+# worker this MUST be a shared backend such as Redis or Memcached; the
+# per-process LocMemCache below is only correct for a single worker.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# AdaptIQ warm start: preload question caches when a WSGI/ASGI worker boots
+ADAPTIQ_WARM_START = False
+ADAPTIQ_WARM_START_BUDGET = 10  # seconds
+ADAPTIQ_QUESTION_CACHE_CHECK_INTERVAL = 1  # seconds between checks of the shared question version
+ADAPTIQ_QUESTION_CACHE_TTL = 300  # seconds before the question cache is rebuilt regardless
+
+# AdaptIQ rate limiting (sliding window, per authenticated user, else per
+# client address). Anonymous clients are keyed by REMOTE_ADDR; behind a reverse
+# proxy set REST_FRAMEWORK['NUM_PROXIES'] to the number of trusted hops so the
+# address is read from X-Forwarded-For, otherwise every client shares the
+# proxy's budget. A scope set to None is not limited.
+ADAPTIQ_RATE_LIMIT_STORE = 'AdaptIQ.throttling.LocalTokenStore'  # or 'AdaptIQ.throttling.CacheTokenStore'
+ADAPTIQ_RATE_LIMITS = {
+    'submit_answer': '60/min',
+    'proctoring': '30/min',
+    'proctoring_frames': '120/min',
+}
+ADAPTIQ_IDEMPOTENCY_TTL = 300  # seconds a submit_answer result is replayed for
+
+# AdaptIQ server-side proctoring (OpenCV face detection on uploaded frames).
+# Needs numpy and opencv-python-headless<5 (OpenCV 5 has no CascadeClassifier).
+ADAPTIQ_PROCTORING_WORKERS = None  # process pool size, defaults to the CPU count
+ADAPTIQ_PROCTORING_QUEUE_SIZE = 32  # frames in flight before new ones are dropped
+ADAPTIQ_PROCTORING_MAX_BATCH = 10  # frames per upload
+ADAPTIQ_PROCTORING_MAX_FRAME_BYTES = 512 * 1024
+ADAPTIQ_PROCTORING_MISSING_FACE_FRAMES = 3  # consecutive face-less frames per warning
+ADAPTIQ_PROCTORING_IDLE_TTL = 300  # seconds before an idle session's gate and counters are dropped
+
+# AdaptIQ kid mode
+ADAPTIQ_KID_MODE_CACHE_TTL = 60  # seconds a user's kid mode settings are cached
+ADAPTIQ_KID_MODE_GRACE_SECONDS = 2  # allowance for network latency on the time limit
+
+# AdaptIQ background tasks (analytics and history writes off the request path)
+ADAPTIQ_TASK_BACKEND = 'memory'  # 'sqlite' (durable, drained by manage.py run_task_worker) or 'null' (discard)
+ADAPTIQ_TASK_QUEUE_PATH = BASE_DIR / 'task_queue.sqlite3'
+ADAPTIQ_TASK_BATCH_SIZE = 100
+ADAPTIQ_TASK_FLUSH_INTERVAL = 1.0  # seconds, memory backend
+ADAPTIQ_TASK_VISIBILITY_TIMEOUT = 60  # seconds before an unacknowledged job is redelivered
+ADAPTIQ_TASK_MAX_ATTEMPTS = 5
+
+# AdaptIQ bulk question administration
+ADAPTIQ_BULK_MAX_ROWS = 5000  # rows per request
+ADAPTIQ_BULK_CHUNK_SIZE = 500  # rows per transaction
+
+# AdaptIQ offline practice packs
+ADAPTIQ_PRACTICE_PACK_MAX_AGE = 7 * 24 * 3600  # seconds a pack can be uploaded after it was issued
+ADAPTIQ_PRACTICE_PACK_MAX_PER_DIFFICULTY = 50
+
+# AdaptIQ HTTP caching for read-only endpoints
+ADAPTIQ_HTTP_CACHE_MAX_AGE = 0  # seconds clients may reuse a response before revalidating
+ADAPTIQ_RESPONSE_CACHE_TTL = 60  # seconds a rendered response stays in the server cache
+
+# AdaptIQ traffic recording (replay with manage.py replay_traffic)
+ADAPTIQ_TRAFFIC_RECORDING = False
+ADAPTIQ_TRAFFIC_LOG_PATH = BASE_DIR / 'traffic.jsonl'
+ADAPTIQ_TRAFFIC_PATH_PREFIX = '/api/quiz/'
+ADAPTIQ_TRAFFIC_SAMPLE_RATE = 1.0  # fraction of requests recorded
+ADAPTIQ_TRAFFIC_REDACT_FIELDS = ['password', 'parent_pin', 'pack']